@@ -0,0 +1,155 @@
+"""Sanatçı biyografisi çözümlemesinin gecikmesini (p50/p95) yerel bir Wikipedia/MusicBrainz taklidine karşı ölçer.
+
+Karşılaştırılan iki yol:
+- seri: eski akış. Önce MusicBrainz, ardından her sorgu × dil için ayrı bir Wikipedia isteği; ilk geçerli sonuçta durur.
+- eşzamanlı: MusicEngine._fetch_artist_info. MusicBrainz ile dil başına tek toplu Wikipedia isteği aynı anda çalışır.
+Her istek sunucu tarafında sabit bir gecikmeyle yanıtlanır.
+Kullanım: python benchmarks/artist_info.py [--latency 0.12] [--artists 40]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import musicbrainzngs
+
+from tools.engine import MusicEngine
+from tools.upstream import TokenBucket
+
+BIO = "{name}, Türk pop müziği şarkıcısı ve söz yazarıdır. İlk albümünü yayımladıktan sonra geniş bir dinleyici kitlesine ulaşmıştır."
+
+
+def build_catalogue(count):
+    """Sanatçı adı -> (MusicBrainz türü, {dil: {başlık: özet}}) eşlemesi üretir; farklı kazanan konumları içerir."""
+    catalogue = {}
+    for i in range(count):
+        name = f"Sanatçı {i:03d}"
+        kind = i % 4
+        pages = {'tr': {}, 'en': {}}
+        if kind == 0:
+            catalogue[name] = ('Person', pages); pages['tr'][f"{name} (şarkıcı)"] = BIO.format(name=name)
+        elif kind == 1:
+            catalogue[name] = ('Group', pages); pages['en'][name] = BIO.format(name=name).replace('şarkıcısı', 'band (rock)')
+        elif kind == 2:
+            catalogue[name] = (None, pages); pages['en'][f"{name} (şarkıcı)"] = BIO.format(name=name)
+        else:
+            catalogue[name] = ('Person', pages)
+    return catalogue
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, content_type):
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path.startswith('/ws/2/artist'):
+            name = params.get('query', [''])[0].split('artist:', 1)[-1].strip('()"\\ ')
+            kind = server.catalogue.get(name, (None, None))[0]
+            artist = f'<artist id="00000000-0000-0000-0000-000000000000" ext:score="100"{f" type={chr(34)}{kind}{chr(34)}" if kind else ""}><name>{name}</name></artist>' if name in server.catalogue else ''
+            self._send('<?xml version="1.0" encoding="UTF-8"?><metadata xmlns="http://musicbrainz.org/ns/mmd-2.0#" '
+                       'xmlns:ext="http://musicbrainz.org/ns/ext#-2.0">'
+                       f'<artist-list count="{1 if artist else 0}" offset="0">{artist}</artist-list></metadata>', 'application/xml')
+            return
+        lang = url.path.strip('/').split('/')[0]
+        pages = []
+        for title in params.get('titles', [''])[0].split('|'):
+            extract = next((p[lang].get(title) for p in (v[1] for v in server.catalogue.values()) if p[lang].get(title)), None)
+            pages.append({'title': title, 'extract': extract} if extract else {'title': title, 'missing': True})
+        self._send(json.dumps({'query': {'pages': pages}}), 'application/json')
+
+
+def serial_lookup(engine, artist_name):
+    """Değişiklik öncesi akışın istek düzeni: her başlık için ayrı, sıralı bir Wikipedia isteği."""
+    try:
+        mb_type = engine._musicbrainz_artist_type(artist_name)
+    except Exception:
+        mb_type = None
+    for query in engine._artist_bio_queries(artist_name, mb_type):
+        for lang in engine.WIKIPEDIA_LANGUAGES:
+            summary = engine._wikipedia_intros(lang, [query]).get(query)
+            if summary and engine._is_artist_bio(artist_name, query, summary):
+                return summary
+    return None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(func, names, server):
+    timings = []
+    start_requests = server.requests
+    for name in names:
+        start = time.perf_counter()
+        func(name)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), percentile(timings, 0.95), (server.requests - start_requests) / len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.12, help="Her isteğin sunucu gecikmesi (saniye)")
+    parser.add_argument('--artists', type=int, default=40)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.latency, server.lock, server.requests = args.latency, threading.Lock(), 0
+    server.catalogue = build_catalogue(args.artists)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    musicbrainzngs.set_hostname(f"127.0.0.1:{server.server_address[1]}", use_https=False)
+    musicbrainzngs.set_rate_limit(False)
+
+    names = list(server.catalogue)
+    old_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        engine = MusicEngine(cache_path=os.path.join(tmp, 'api_cache.db'))
+        engine.WIKIPEDIA_API_URL = f"http://127.0.0.1:{server.server_address[1]}/{{lang}}/w/api.php"
+        # Yerel taklit sunucu hız sınırı uygulamaz; istemci tarafı jeton kovaları gecikme ölçümünü bozmasın diye kaldırılır.
+        for guard in engine.upstreams.values():
+            guard.bucket = TokenBucket(1000, 1000)
+        serial = measure(lambda name: serial_lookup(engine, name), names, server)
+        concurrent = measure(lambda name: engine._fetch_artist_info(f"artist_v3:{name}", name), names, server)
+        before = server.requests
+        for name in names:
+            engine.get_artist_info(name)
+        repeat_requests = server.requests - before
+        engine._disk_cache.close()
+        os.chdir(old_cwd)
+    server.shutdown()
+
+    print(f"\n{args.artists} sanatçı, istek başına {args.latency * 1000:.0f} ms gecikme")
+    print(f"{'yol':<12}{'p50':>10}{'p95':>10}{'istek/sanatçı':>16}")
+    for label, (p50, p95, per_artist) in (('seri', serial), ('eşzamanlı', concurrent)):
+        print(f"{label:<12}{p50:>7.0f} ms{p95:>7.0f} ms{per_artist:>16.1f}")
+    print(f"Tekrar sorgu (biyografisi olmayanlar dahil, önbellekten): {repeat_requests} istek")
+
+
+if __name__ == '__main__':
+    main()
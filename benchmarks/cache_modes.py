@@ -0,0 +1,90 @@
+"""Önbelleğe alınan şarkı başına FFmpeg CPU süresini iki önbellek modunda ölçer: 'remux' ve 'transcode'.
+
+Ağ kullanmaz. FFmpeg ile YouTube'un sunduğu biçimlere benzeyen yerel kaynak dosyalar üretir (WebM içinde Opus,
+M4A içinde AAC). Ardından MusicEngine.CACHE_MODES'daki yt-dlp son işlemcisini bunlar üzerinde çalıştırır.
+CPU süresi, alt süreçlerin (ffmpeg/ffprobe) kullanıcı + sistem süresidir.
+Kullanım: python benchmarks/cache_modes.py [--seconds 240] [--tracks 3] [--ffmpeg-location YOL]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yt_dlp
+from yt_dlp.postprocessor import FFmpegExtractAudioPP
+
+from tools.engine import MusicEngine
+
+SOURCES = {
+    'webm': ['-c:a', 'libopus', '-b:a', '160k'],
+    'm4a': ['-c:a', 'aac', '-b:a', '128k'],
+}
+
+
+def make_source(ffmpeg, path, seconds, codec_args):
+    subprocess.run([ffmpeg, '-v', 'error', '-y', '-f', 'lavfi', '-i', f"sine=frequency=440:duration={seconds}",
+                    '-f', 'lavfi', '-i', f"anoisesrc=duration={seconds}:amplitude=0.05", '-filter_complex', 'amix=inputs=2',
+                    '-ac', '2', '-ar', '48000', *codec_args, path], check=True)
+
+
+def child_cpu_seconds():
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def run_mode(mode, source_path, source_ext, work_dir, ffmpeg_location):
+    pp_args = {k: v for k, v in MusicEngine.CACHE_MODES[mode]['postprocessors'][0].items() if k != 'key'}
+    ydl_opts = {'quiet': True, 'no_warnings': True}
+    if ffmpeg_location:
+        ydl_opts['ffmpeg_location'] = ffmpeg_location
+    path = os.path.join(work_dir, f"track.{source_ext}")
+    shutil.copyfile(source_path, path)
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        pp = FFmpegExtractAudioPP(ydl, **pp_args)
+        cpu_before, wall_before = child_cpu_seconds(), time.perf_counter()
+        _, info = pp.run({'filepath': path, 'ext': source_ext, 'id': 'track'})
+        cpu, wall = child_cpu_seconds() - cpu_before, time.perf_counter() - wall_before
+    out_path = info['filepath']
+    size = os.path.getsize(out_path)
+    for name in os.listdir(work_dir):
+        os.remove(os.path.join(work_dir, name))
+    return cpu, wall, info['ext'], size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=int, default=240)
+    parser.add_argument('--tracks', type=int, default=3)
+    parser.add_argument('--ffmpeg-location', default=None)
+    args = parser.parse_args()
+
+    ffmpeg = os.path.join(args.ffmpeg_location, 'ffmpeg') if args.ffmpeg_location else shutil.which('ffmpeg')
+    if not ffmpeg or not os.path.exists(ffmpeg):
+        sys.exit("ffmpeg bulunamadı; PATH'e ekleyin ya da --ffmpeg-location verin.")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.seconds} sn'lik kaynak dosyalar hazırlanıyor...")
+        sources = {}
+        for ext, codec_args in SOURCES.items():
+            sources[ext] = os.path.join(tmp, f"source.{ext}")
+            make_source(ffmpeg, sources[ext], args.seconds, codec_args)
+        work_dir = os.path.join(tmp, 'work')
+        os.makedirs(work_dir)
+
+        print(f"{'kaynak':<8}{'mod':<11}{'çıktı':<7}{'CPU/şarkı':>12}{'süre/şarkı':>13}{'boyut':>10}")
+        for ext, source_path in sources.items():
+            for mode in MusicEngine.CACHE_MODES:
+                runs = [run_mode(mode, source_path, ext, work_dir, args.ffmpeg_location) for _ in range(args.tracks)]
+                cpu = statistics.mean(r[0] for r in runs)
+                wall = statistics.mean(r[1] for r in runs)
+                print(f"{ext:<8}{mode:<11}{runs[0][2]:<7}{cpu * 1000:>9.0f} ms{wall * 1000:>10.0f} ms{runs[0][3] / 1024:>7.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
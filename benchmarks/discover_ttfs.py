@@ -0,0 +1,68 @@
+"""Keşfet sayfasının ilk bölümü gösterme süresini (time-to-first-section) ölçer.
+
+İki durum karşılaştırılır:
+- toplu: tüm kategoriler bitene kadar beklenir. populate_discover_page'in eski davranışı budur.
+- akışlı: refresh_discover_data(on_section=...) ile ilk bölüm hazır olur olmaz çizilir.
+YTMusic yerine kategori başına farklı gecikmeyle yanıt veren yerel bir taklit kullanılır.
+Kullanım: python benchmarks/discover_ttfs.py [--min-latency 0.15] [--max-latency 1.5] [--runs 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.engine import MusicEngine
+
+
+class FakeYTMusic:
+    def __init__(self, min_latency, max_latency, seed):
+        self.rng = random.Random(seed)
+        self.min_latency, self.max_latency = min_latency, max_latency
+
+    def search(self, query, filter=None, limit=5):
+        time.sleep(self.rng.uniform(self.min_latency, self.max_latency))
+        return [{'title': f"{query} #{i}", 'browseId': f"VL{abs(hash(query)) % 10**8}{i}",
+                 'thumbnails': [{'url': f"http://127.0.0.1/{i}.jpg"}]} for i in range(limit)]
+
+
+def run_once(engine, streaming):
+    engine._api_cache.clear(); engine._disk_cache.clear()
+    first = []
+    start = time.perf_counter()
+    on_section = (lambda title, playlists: first.append(time.perf_counter()) if not first else None) if streaming else None
+    engine.refresh_discover_data(on_section=on_section)
+    total = time.perf_counter() - start
+    return ((first[0] - start) if first else total) * 1000, total * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--min-latency', type=float, default=0.15)
+    parser.add_argument('--max-latency', type=float, default=1.5)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    old_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        engine = MusicEngine(cache_path=os.path.join(tmp, 'api_cache.db'))
+        results = {}
+        for label, streaming in (('toplu', False), ('akışlı', True)):
+            engine.ytmusic = FakeYTMusic(args.min_latency, args.max_latency, seed=42)
+            results[label] = [run_once(engine, streaming) for _ in range(args.runs)]
+        engine._disk_cache.close()
+        os.chdir(old_cwd)
+
+    print(f"\n{len(MusicEngine.DISCOVER_CATEGORIES)} kategori, kategori başına {args.min_latency * 1000:.0f}-{args.max_latency * 1000:.0f} ms gecikme, {args.runs} tekrar")
+    print(f"{'mod':<10}{'ilk bölüm (medyan)':>22}{'tamamı (medyan)':>20}")
+    for label, runs in results.items():
+        print(f"{label:<10}{statistics.median(r[0] for r in runs):>19.0f} ms{statistics.median(r[1] for r in runs):>17.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
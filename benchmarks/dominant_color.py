@@ -0,0 +1,67 @@
+"""Baskın renk çıkarımını karşılaştırır: ColorThief (saf Python median-cut, quality=5) ile NumPy vektörel nicemleyici.
+
+Farklı boyutlarda sentetik kapaklar (arka plan rengi + gürültü + farklı renkte bloklar) üretilir; her yöntem için
+resim başına süre ve bulunan rengin ColorThief sonucuna uzaklığı raporlanır.
+Kullanım: python benchmarks/dominant_color.py [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from io import BytesIO
+
+from colorthief import ColorThief
+from PyQt6.QtCore import QBuffer, QIODevice, QRect
+from PyQt6.QtGui import QColor, QGuiApplication, QImage, QPainter
+
+from tools.dominant_color import dominant_color
+
+
+def synthetic_cover(size, seed):
+    rng = random.Random(seed)
+    image = QImage(size, size, QImage.Format.Format_RGB32)
+    image.fill(QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    painter = QPainter(image)
+    for _ in range(6):
+        w, h = rng.randint(size // 10, size // 3), rng.randint(size // 10, size // 3)
+        painter.fillRect(QRect(rng.randrange(size - w), rng.randrange(size - h), w, h), QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    painter.end()
+    buffer = QBuffer(); buffer.open(QIODevice.OpenModeFlag.WriteOnly); image.save(buffer, "JPG", 90)
+    data = bytes(buffer.data())
+    return QImage.fromData(data), data
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    app = QGuiApplication(sys.argv)
+
+    print(f"{'boyut':>8}{'ColorThief':>14}{'NumPy':>12}{'hızlanma':>11}{'renk farkı':>13}")
+    for size in (44, 64, 226, 544):
+        thief_ms, numpy_ms, distances = [], [], []
+        for seed in range(8):
+            image, data = synthetic_cover(size, seed)
+            ms, thief_color = timed(lambda: ColorThief(BytesIO(data)).get_color(quality=5), args.repeat)
+            thief_ms.append(ms)
+            ms, numpy_color = timed(lambda: dominant_color(image), args.repeat)
+            numpy_ms.append(ms)
+            distances.append(sum((a - b) ** 2 for a, b in zip(thief_color, numpy_color)) ** 0.5)
+        thief, vectorised = sum(thief_ms) / len(thief_ms), sum(numpy_ms) / len(numpy_ms)
+        print(f"{size:>5} px{thief:>11.2f} ms{vectorised:>9.2f} ms{thief / vectorised:>10.1f}x{sum(distances) / len(distances):>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
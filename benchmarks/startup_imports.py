@@ -0,0 +1,87 @@
+"""Uygulama açılışındaki modül içe aktarma süresini (python -X importtime) ve MusicEngine() kurulum süresini raporlar.
+
+Her ölçüm temiz bir alt süreçte yapılır: 'import main' ve ardından GUI iş parçacığında çalışan MusicEngine() çağrısı.
+--baseline ile verilen git revizyonu geçici bir dizine çıkarılır ve aynı ölçüm onun için de yapılır (önce/sonra karşılaştırması).
+Kullanım: python benchmarks/startup_imports.py [--baseline HEAD~1] [--runs 5] [--top 12]
+"""
+import argparse
+import io
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+PROBE = """
+import os, sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+engine = main.MusicEngine(cache_path=os.path.join(os.getcwd(), 'probe_cache.db'))
+constructed = time.perf_counter()
+print(f"PROBE {imported - start:.6f} {constructed - imported:.6f}", flush=True)
+os._exit(0)
+"""
+
+
+def export_revision(revision, target):
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision], cwd=REPO_ROOT, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+
+def run_probe(tree):
+    """Tek bir soğuk açılışı ölçer: (import süresi, MusicEngine() süresi, {üst düzey modül: kümülatif µs})."""
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONDONTWRITEBYTECODE='1')
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE, tree], cwd=workdir, env=env,
+                                capture_output=True, text=True, errors='replace')
+    probe = re.search(r'PROBE ([\d.]+) ([\d.]+)', result.stdout)
+    if not probe:
+        raise RuntimeError(f"Ölçüm başarısız:\n{result.stdout}\n{result.stderr[-2000:]}")
+    top_level = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Girintisi 3 boşluk olan satırlar main.py'nin doğrudan içe aktardığı modüllerdir.
+        if match and len(match.group(3)) == 3:
+            top_level[match.group(4)] = top_level.get(match.group(4), 0) + int(match.group(2))
+    return float(probe.group(1)) * 1000, float(probe.group(2)) * 1000, top_level
+
+
+def measure(label, tree, runs):
+    probes = [run_probe(tree) for _ in range(runs)]
+    return {'label': label, 'import_ms': statistics.median(p[0] for p in probes),
+            'engine_ms': statistics.median(p[1] for p in probes), 'modules': probes[-1][2]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--baseline', help="Karşılaştırılacak git revizyonu (ör. HEAD~1)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args()
+
+    reports = []
+    with tempfile.TemporaryDirectory() as baseline_tree:
+        if args.baseline:
+            export_revision(args.baseline, baseline_tree)
+            reports.append(measure(f"önce ({args.baseline})", baseline_tree, args.runs))
+        reports.append(measure("sonra (çalışma ağacı)", REPO_ROOT, args.runs))
+
+    print(f"\n{args.runs} soğuk açılışın medyanı")
+    print(f"{'ağaç':<28}{'import main':>14}{'MusicEngine()':>16}{'toplam':>12}")
+    for report in reports:
+        print(f"{report['label']:<28}{report['import_ms']:>11.0f} ms{report['engine_ms']:>13.0f} ms{report['import_ms'] + report['engine_ms']:>9.0f} ms")
+    for report in reports:
+        print(f"\nmain.py'nin en pahalı doğrudan içe aktarmaları — {report['label']} (kümülatif, -X importtime):")
+        for name, micros in sorted(report['modules'].items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {name:<40}{micros / 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""StreamProxy'yi yerel bir taklit upstream sunucusuna karşı çalıştırır.
+
+VLC'nin yaptığı gibi aralıklı (Range) istekler gönderir. Ardından önbellek dosyasının
+kaynakla birebir aynı olduğunu ve upstream'den her baytın yalnızca bir kez çekildiğini doğrular.
+Kullanım: python benchmarks/tee_proxy.py [--size-mb 8]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.stream_proxy import StreamProxy
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        payload = self.server.payload
+        start, end = 0, len(payload) - 1
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), end)
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(payload)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'audio/webm')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(payload[start:end + 1])
+        with self.server.lock:
+            self.server.bytes_sent += end - start + 1
+
+
+def fetch(url, byte_range=None):
+    headers = {'Range': byte_range} if byte_range else {}
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as response:
+        return response.read()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=float, default=8)
+    args = parser.parse_args()
+
+    payload = os.urandom(int(args.size_mb * 1024 * 1024))
+    upstream = ThreadingHTTPServer(('127.0.0.1', 0), UpstreamHandler)
+    upstream.daemon_threads = True
+    upstream.payload, upstream.bytes_sent, upstream.lock = payload, 0, threading.Lock()
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}/audio"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        proxy = StreamProxy(cache_dir, chunk_size=1024 * 1024)
+        local_url = proxy.register('testvideo01', upstream_url, 'webm')
+
+        start = time.perf_counter()
+        head = fetch(local_url, 'bytes=0-65535')
+        first_bytes_ms = (time.perf_counter() - start) * 1000
+        tail = fetch(local_url, f"bytes={len(payload) - 4096}-")
+        body = fetch(local_url)
+        assert head == payload[:65536] and tail == payload[-4096:] and body == payload, "proxy yanıtı kaynakla uyuşmuyor"
+
+        cached_path = os.path.join(cache_dir, 'testvideo01.webm')
+        deadline = time.time() + 10
+        while not os.path.exists(cached_path) and time.time() < deadline:
+            time.sleep(0.05)
+        with open(cached_path, 'rb') as f:
+            assert f.read() == payload, "önbellek dosyası kaynakla uyuşmuyor"
+
+        stats = proxy.stats()
+        proxy.shutdown()
+    upstream.shutdown()
+
+    print(f"İlk baytlar: {first_bytes_ms:.1f} ms")
+    print(f"Kaynak boyutu: {len(payload)} bayt, upstream'den çekilen: {upstream.bytes_sent} bayt "
+          f"({upstream.bytes_sent / len(payload):.2f}x)")
+    print(f"Proxy istatistikleri: {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""200 kapak resimlik bir sayfa yüklemesinde açılan bağlantı sayısını ve süreyi yerel bir HTTP sunucusuna karşı ölçer.
+
+Karşılaştırılan iki yol (ImageLoader gibi 8 iş parçacığıyla):
+- requests.get: her resim için yeni bir TCP bağlantısı (değişiklik öncesi ImageWorker davranışı).
+- http_pool: tools.http_pool'un paylaşılan keep-alive havuzu.
+Sunucu yeni her bağlantıda --handshake-delay kadar bekler; gerçek ağdaki TCP+TLS el sıkışmasını taklit eder.
+Kullanım: python benchmarks/thumbnail_connections.py [--images 200] [--threads 8] [--handshake-delay 0.03] [--latency 0.005]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from tools.http_pool import HTTPPool
+
+THUMBNAIL = b'\xff\xd8\xff\xe0' + os.urandom(6 * 1024)
+
+
+class ThumbnailHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Başlık ve gövde ayrı yazıldığından Nagle + gecikmeli ACK keep-alive bağlantılarda ~40 ms ekler; gerçek sunucular gibi kapatılır.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake_delay)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(THUMBNAIL)))
+        self.end_headers()
+        self.wfile.write(THUMBNAIL)
+
+
+def load_page(fetch, urls, threads):
+    def one(url):
+        response = fetch(url, timeout=10)
+        response.raise_for_status()
+        return len(response.content)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        total = sum(executor.map(one, urls))
+    return time.perf_counter() - start, total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--handshake-delay', type=float, default=0.03)
+    parser.add_argument('--latency', type=float, default=0.005)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThumbnailHandler)
+    server.daemon_threads = True
+    server.lock, server.connections, server.requests = threading.Lock(), 0, 0
+    server.handshake_delay, server.latency = args.handshake_delay, args.latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/vi/{i:04d}/hqdefault.jpg" for i in range(args.images)]
+
+    pool = HTTPPool(per_host=args.threads)
+    results = []
+    for label, fetch in (('requests.get', requests.get), ('http_pool', pool.get)):
+        server.connections = server.requests = 0
+        elapsed, total = load_page(fetch, urls, args.threads)
+        results.append((label, elapsed, server.connections, server.requests, total))
+    pool_stats = pool.stats()
+    pool.close()
+    server.shutdown()
+
+    print(f"\n{args.images} kapak, {args.threads} iş parçacığı, bağlantı başına {args.handshake_delay * 1000:.0f} ms el sıkışma, istek başına {args.latency * 1000:.0f} ms")
+    print(f"{'yol':<14}{'süre':>10}{'bağlantı':>11}{'istek':>8}")
+    for label, elapsed, connections, request_count, _ in results:
+        print(f"{label:<14}{elapsed * 1000:>7.0f} ms{connections:>11}{request_count:>8}")
+    print(f"Havuz istatistikleri: {pool_stats['connections_opened']} bağlantı, {pool_stats['requests']} istek, {pool_stats['sessions']} oturum")
+
+
+if __name__ == '__main__':
+    main()
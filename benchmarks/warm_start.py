@@ -0,0 +1,59 @@
+"""Soğuk ve sıcak (kalıcı önbellekli) başlangıçta ilk aramanın gecikmesini karşılaştırır.
+
+Kullanım: python benchmarks/warm_start.py [--latency 0.8] [--live]
+--live verilmezse YTMusic yerine sabit gecikmeli yerel bir taklit kullanılır.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.engine import MusicEngine
+
+
+class FakeYTMusic:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def search(self, query, filter=None, limit=20):
+        time.sleep(self.latency)
+        return [{
+            'videoId': f"vid{i:04d}", 'title': f"{query} #{i}", 'duration_seconds': 180,
+            'artists': [{'name': 'Test Sanatçı'}], 'thumbnails': [{'url': f"http://127.0.0.1/{i}.jpg"}]
+        } for i in range(limit)]
+
+
+def first_search_latency(cache_path, query, latency, live):
+    engine = MusicEngine(cache_path=cache_path)
+    if not live:
+        engine.ytmusic = FakeYTMusic(latency)
+    start = time.perf_counter()
+    engine.search_ytmusic(query)
+    elapsed = time.perf_counter() - start
+    engine._disk_cache.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--query', default="Türkçe Rock")
+    parser.add_argument('--latency', type=float, default=0.8, help="Taklit YTMusic gecikmesi (saniye)")
+    parser.add_argument('--live', action='store_true', help="Gerçek YTMusic API'sini kullan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'api_cache.db')
+        cold = first_search_latency(cache_path, args.query, args.latency, args.live)
+        warm = first_search_latency(cache_path, args.query, args.latency, args.live)
+
+    print(f"Soğuk başlangıç ilk arama: {cold * 1000:.1f} ms")
+    print(f"Sıcak başlangıç ilk arama: {warm * 1000:.1f} ms")
+    if warm > 0:
+        print(f"Hızlanma: {cold / warm:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
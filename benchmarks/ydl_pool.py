@@ -0,0 +1,78 @@
+"""Çağrı başına yt-dlp çıkarma yükünü ölçer: her çağrıda yeni YoutubeDL ile havuzdan ödünç alınan örnek.
+
+Ağ kullanmaz; YouTube yerine yerel bir taklit çıkarıcı (LocalIE) kullanılır.
+Kullanım: python benchmarks/ydl_pool.py [--calls 200]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+
+from tools.ydl_pool import YDLPool
+
+YDL_OPTS = {'format': 'bestaudio/best', 'quiet': True, 'no_warnings': True}
+
+
+class LocalIE(InfoExtractor):
+    _VALID_URL = r'local:(?P<id>\w+)'
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        return {
+            'id': video_id, 'title': f"Yerel {video_id}",
+            'formats': [
+                {'format_id': 'opus', 'url': f"http://127.0.0.1/{video_id}.webm", 'ext': 'webm', 'acodec': 'opus', 'vcodec': 'none', 'abr': 160},
+                {'format_id': 'aac', 'url': f"http://127.0.0.1/{video_id}.m4a", 'ext': 'm4a', 'acodec': 'mp4a.40.2', 'vcodec': 'none', 'abr': 128},
+            ],
+        }
+
+
+def make_ydl(opts):
+    ydl = yt_dlp.YoutubeDL(opts)
+    ydl.add_info_extractor(LocalIE())
+    return ydl
+
+
+def fresh_instance_call(video_id):
+    with make_ydl(YDL_OPTS) as ydl:
+        return ydl.extract_info(f"local:{video_id}", download=False, ie_key='Local')['url']
+
+
+def pooled_call(pool, video_id):
+    with pool.borrow() as ydl:
+        return ydl.extract_info(f"local:{video_id}", download=False, ie_key='Local')['url']
+
+
+def measure(func, calls):
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        func(f"v{i}")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    pool = YDLPool(YDL_OPTS, size=1, warm_extractors=('Local',), ydl_factory=make_ydl)
+    pool.prewarm(background=False)
+
+    before_mean, before_median = measure(fresh_instance_call, args.calls)
+    after_mean, after_median = measure(lambda vid: pooled_call(pool, vid), args.calls)
+    pool.close()
+
+    print(f"Yeni YoutubeDL/çağrı : ort. {before_mean:.2f} ms, medyan {before_median:.2f} ms")
+    print(f"Havuzdan ödünç/çağrı : ort. {after_mean:.2f} ms, medyan {after_median:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
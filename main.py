@@ -1,19 +1,25 @@
-import sys, os, json, requests, vlc, shutil, time, warnings
+import sys, os, json, shutil, time, threading, warnings, multiprocessing
+from tools.startup_profiler import startup_profiler
 from collections import deque
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QSize, QRunnable, QThreadPool, QObject
-from PyQt6.QtGui import QPixmap, QIcon, QMovie, QCursor, QColor
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QSize, QRunnable, QThreadPool, QObject, QBuffer, QIODevice
+from PyQt6.QtGui import QPixmap, QImageReader, QIcon, QMovie, QCursor, QColor
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QPushButton, QSlider, QHBoxLayout, QVBoxLayout,
     QLabel, QLineEdit, QListWidget, QListWidgetItem, QSplitter, QStyle,
     QMessageBox, QInputDialog, QMenu, QStackedWidget, QTextBrowser, QDialog,
     QFileDialog, QDialogButtonBox, QFormLayout, QComboBox, QCheckBox,
-    QSplashScreen, QScrollArea
+    QSplashScreen, QScrollArea, QSpinBox, QPlainTextEdit
 )
 from tools.engine import MusicEngine
 from tools.themes import get_theme, get_color_for_theme
 from tools.flow_layout import FlowLayout
-from colorthief import ColorThief
-from io import BytesIO
+from tools.download_manager import DownloadManager
+from tools.prefetcher import Prefetcher, TrackGapMeter
+from tools.thumbnail_cache import ThumbnailCache
+from tools.pixmap_cache import PixmapCache
+from tools.http_pool import http_pool
+from tools.dominant_color import dominant_color
+IMPORTS_DONE_AT = time.perf_counter()
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -27,7 +33,18 @@ def load_db():
         'settings': {
             'theme': 'dark',
             'show_right_panel': True,
-            'auto_download': True
+            'auto_download': True,
+            'max_concurrent_downloads': 2,
+            'prefetch_depth': 2,
+            'prefetch_audio': False,
+            'prefetch_budget_mb': 200,
+            'gapless': True,
+            'cache_quota_mb': 2048,
+            'cache_eviction_policy': 'lru',
+            'cache_mode': 'remux',
+            'thumbnail_cache_mb': 200,
+            'pixmap_cache_mb': 128,
+            'discover_categories': list(MusicEngine.DISCOVER_CATEGORIES)
         }
     }
     if not os.path.exists(DB_FILE): return defaults
@@ -39,75 +56,156 @@ def load_db():
         data['settings'].setdefault('theme', 'dark')
         data['settings'].setdefault('show_right_panel', True)
         data['settings'].setdefault('auto_download', True)
+        data['settings'].setdefault('max_concurrent_downloads', 2)
+        data['settings'].setdefault('prefetch_depth', 2)
+        data['settings'].setdefault('prefetch_audio', False)
+        data['settings'].setdefault('prefetch_budget_mb', 200)
+        data['settings'].setdefault('gapless', True)
+        # Kota eklenmeden önce kurulmuş önbellekler sınırsız kalır; kullanıcı kota seçmeden şarkı silinmez.
+        data['settings'].setdefault('cache_quota_mb', 0)
+        data['settings'].setdefault('cache_eviction_policy', 'lru')
+        data['settings'].setdefault('cache_mode', 'remux')
+        data['settings'].setdefault('thumbnail_cache_mb', 200)
+        data['settings'].setdefault('pixmap_cache_mb', 128)
+        data['settings'].setdefault('discover_categories', list(MusicEngine.DISCOVER_CATEGORIES))
         return data
     except (json.JSONDecodeError, FileNotFoundError): return defaults
 
 def save_db(data):
     with open(DB_FILE, 'w', encoding='utf-8') as f: json.dump(data, f, indent=4, ensure_ascii=False)
 
+def pixmap_bytes(pixmap):
+    """Çözülmüş resmin bellekte kapladığı bayt: genişlik × yükseklik × renk derinliği."""
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+def widget_on_screen(widget):
+    try: return widget.isVisible() and not widget.visibleRegion().isEmpty()
+    except RuntimeError: return False
+
 class ImageWorkerSignals(QObject):
     finished = pyqtSignal(dict)
 
 class ImageWorker(QRunnable):
-    def __init__(self, cache_key, target_size=None):
+    def __init__(self, cache_key, target_size=None, thumbnail_cache=None, validators=None, want_color=False, check_disk=False):
         super().__init__()
         self.cache_key = cache_key
         self.url = cache_key[0]
         self.target_size = target_size
+        self.thumbnail_cache = thumbnail_cache
+        self.validators = validators
+        self.want_color = want_color
+        self.check_disk = check_disk
         self.signals = ImageWorkerSignals()
 
     def run(self):
-        result = {'cache_key': self.cache_key, 'pixmap': None, 'dominant_color': None, 'error': None}
+        started_at = time.perf_counter()
+        result = {'cache_key': self.cache_key, 'image': None, 'dominant_color': None, 'error': None, 'not_modified': False,
+                  'started_at': started_at, 'fetch_ms': 0.0, 'decode_ms': 0.0, 'disk': None}
         try:
-            response = requests.get(self.url, timeout=10)
+            if self.check_disk and self.thumbnail_cache and self._load_from_disk(result): return
+            headers = {}
+            if self.validators:
+                # Diskteki kopyanın süresi dolmuş; sunucu değişmediğini söylerse (304) yeniden indirilmez.
+                if self.validators.get('etag'): headers['If-None-Match'] = self.validators['etag']
+                if self.validators.get('last_modified'): headers['If-Modified-Since'] = self.validators['last_modified']
+            response = http_pool.get(self.url, timeout=10, headers=headers)
+            result['fetch_ms'] = (time.perf_counter() - started_at) * 1000
+            if response.status_code == 304 and self.validators:
+                if self.thumbnail_cache: self.thumbnail_cache.revalidated(self.url, self.target_size, response.headers)
+                result['not_modified'] = True
+                return
             response.raise_for_status()
             image_data = response.content
-            pixmap = QPixmap()
-            pixmap.loadFromData(image_data)
-
-            if not pixmap.isNull() and self.target_size:
-                pixmap = pixmap.scaled(
-                    self.target_size[0], self.target_size[1],
-                    Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-            result['pixmap'] = pixmap
-            try:
-                color_thief = ColorThief(BytesIO(image_data))
-                result['dominant_color'] = color_thief.get_color(quality=5)
-            except Exception:
-                result['dominant_color'] = (40, 40, 40)
+            decode_start = time.perf_counter()
+            image = self._decode(image_data, self.target_size)
+            result['decode_ms'] = (time.perf_counter() - decode_start) * 1000
+            result['image'] = image
+            if self.want_color:
+                try: result['dominant_color'] = dominant_color(image, image_data) or (40, 40, 40)
+                except Exception: result['dominant_color'] = (40, 40, 40)
+            if self.thumbnail_cache:
+                try: self.thumbnail_cache.store(self.url, self.target_size, self._encode(image) if self.target_size else image_data,
+                                                response.headers, result['dominant_color'])
+                except Exception as e: print(f"Kapak resmi diske yazılamadı ({self.url}): {e}")
 
         except Exception as e:
             result['error'] = str(e)
         finally:
             self.signals.finished.emit(result)
 
+    def _load_from_disk(self, result):
+        """Disk önbelleğindeki kopyayı ağa gitmeden çözer; bulunamaz ya da çözülemezse False döner ve ağdan indirilir."""
+        cached = self.thumbnail_cache.lookup(self.url, self.target_size)
+        if not cached: return False
+        decode_start = time.perf_counter()
+        result['fetch_ms'] = (decode_start - result['started_at']) * 1000
+        try: image = self._decode(cached['data'], self.target_size)
+        except ValueError: return False
+        result['decode_ms'] = (time.perf_counter() - decode_start) * 1000
+        result['image'] = image
+        result['dominant_color'] = cached['color']
+        if self.want_color and not cached['color']:
+            try: result['dominant_color'] = dominant_color(image, cached['data']) or (40, 40, 40)
+            except Exception: result['dominant_color'] = (40, 40, 40)
+        result['disk'] = {'fresh': cached['fresh'], 'etag': cached['etag'], 'last_modified': cached['last_modified']}
+        return True
+
+    @staticmethod
+    def _decode(image_data, target_size):
+        """Baytları QImage'e çözer ve hedef boyutu dolduracak şekilde ölçekler; QPixmap'in aksine iş parçacığında güvenlidir."""
+        buffer = QBuffer(); buffer.setData(image_data); buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        reader = QImageReader(buffer)
+        if target_size:
+            # JPEG gibi biçimler küçültülmüş çözmeyi destekler; tam boyutlu ara resim hiç oluşturulmaz.
+            source_size = reader.size()
+            scaled_size = source_size.scaled(target_size[0], target_size[1], Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+            if source_size.isValid() and scaled_size.width() < source_size.width(): reader.setScaledSize(scaled_size)
+        image = reader.read()
+        if image.isNull(): raise ValueError(f"Resim çözülemedi: {reader.errorString()}")
+        if target_size:
+            image = image.scaled(target_size[0], target_size[1], Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                                 Qt.TransformationMode.SmoothTransformation)
+        return image
+
+    @staticmethod
+    def _encode(image):
+        """Ölçeklenmiş resmi diske yazmak için kodlar; saydamlık yoksa JPEG, varsa PNG."""
+        buffer = QBuffer(); buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        if image.hasAlphaChannel(): image.save(buffer, "PNG")
+        else: image.save(buffer, "JPG", 90)
+        return bytes(buffer.data())
+
 class ImageLoader:
     PRIORITY_HIGH = 0
     PRIORITY_NORMAL = 1
     def __init__(self, parent_player):
         self.parent_player = parent_player
+        cache_mb = parent_player.db['settings'].get('thumbnail_cache_mb', 200)
+        self.thumbnail_cache = ThumbnailCache('thumbnail_cache', max_bytes=cache_mb * 1024 * 1024)
         self.threadpool = QThreadPool()
         max_threads = min(QThreadPool.globalInstance().maxThreadCount(), 8)
         self.threadpool.setMaxThreadCount(max_threads)
         self.high_priority_queue = deque()
         self.normal_priority_queue = deque()
         self.pending_requests = {}
-        self.processing_timer = QTimer()
-        self.processing_timer.setInterval(50)
-        self.processing_timer.timeout.connect(self._process_queues)
-        self.processing_timer.start()
-
-    def request_image(self, url, widget=None, priority=PRIORITY_NORMAL, callback=None, target_size=None):
+        self.dominant_colors = {}
+        # Zamanlayıcıyla yoklama yapılmaz: dağıtımı yeni istekler ve biten işler tetikler.
+        self.in_flight = 0
+        self._dispatch_scheduled = False
+        self.timings = deque(maxlen=200)
+        self._unreported = 0
+
+    def request_image(self, url, widget=None, priority=PRIORITY_NORMAL, callback=None, target_size=None, want_color=False):
+        """Resmi bellekten, diskten ya da ağdan yükler; want_color ise callback'e URL başına önbelleğe alınan baskın renk de verilir."""
         if not url: return
         cache_key = (url, tuple(target_size) if target_size else None)
-        if cache_key in self.parent_player.pixmap_cache:
-            pixmap = self.parent_player.pixmap_cache[cache_key]
+        pixmap = self.parent_player.pixmap_cache.get(cache_key)
+        if pixmap is not None:
             try:
                 if hasattr(widget, 'set_image'): widget.set_image(pixmap)
                 elif isinstance(widget, QLabel): widget.setPixmap(pixmap)
-                if callback: pass
+                if widget: self.parent_player.pixmap_cache.pin(cache_key, widget)
+                if callback: callback(pixmap, self._color_for(url, pixmap) if want_color else None)
             except RuntimeError: pass
             return
 
@@ -115,46 +213,112 @@ class ImageLoader:
             if widget and widget not in self.pending_requests[cache_key]['widgets']:
                 self.pending_requests[cache_key]['widgets'].append(widget)
             if callback: self.pending_requests[cache_key]['callback'] = callback
+            self.pending_requests[cache_key]['want_color'] |= want_color
             return
 
-        request_details = {'widgets': [widget] if widget else [], 'callback': callback}
+        # Disk önbelleği de iş parçacığında okunur ve çözülür; GUI iş parçacığında yalnızca bellek önbelleğine bakılır.
+        self._enqueue(cache_key, {'widgets': [widget] if widget else [], 'callback': callback, 'validators': None,
+                                  'want_color': want_color and url not in self.dominant_colors, 'check_disk': True}, priority)
+
+    def _enqueue(self, cache_key, request_details, priority):
+        request_details['enqueued_at'] = time.perf_counter()
         self.pending_requests[cache_key] = request_details
         if priority == self.PRIORITY_HIGH: self.high_priority_queue.appendleft(cache_key)
         else: self.normal_priority_queue.append(cache_key)
+        self._schedule_dispatch()
+
+    def _schedule_dispatch(self):
+        """Dağıtımı olay döngüsünün bir sonraki turuna erteler; aynı turda gelen istekler tek seferde ve öncelik sırasıyla dağıtılır."""
+        if self._dispatch_scheduled: return
+        self._dispatch_scheduled = True
+        QTimer.singleShot(0, self._process_queues)
 
     def _process_queues(self):
-        while self.threadpool.activeThreadCount() < self.threadpool.maxThreadCount():
+        self._dispatch_scheduled = False
+        while self.in_flight < self.threadpool.maxThreadCount():
             if not self.high_priority_queue and not self.normal_priority_queue: break
             cache_key = self.high_priority_queue.popleft() if self.high_priority_queue else self.normal_priority_queue.popleft()
             if cache_key not in self.pending_requests: continue
             url, target_size_tuple = cache_key
             target_size = list(target_size_tuple) if target_size_tuple else None
-            worker = ImageWorker(cache_key, target_size=target_size)
+            request_info = self.pending_requests[cache_key]
+            worker = ImageWorker(cache_key, target_size=target_size, thumbnail_cache=self.thumbnail_cache, validators=request_info['validators'],
+                                 want_color=request_info['want_color'], check_disk=request_info['check_disk'])
             worker.signals.finished.connect(self._on_worker_finished)
+            self.in_flight += 1
             self.threadpool.start(worker)
 
     def _on_worker_finished(self, result):
+        # Boşalan iş parçacığı, teslimattan önce kuyruktaki bir sonraki işe verilir.
+        self.in_flight -= 1
+        self._process_queues()
         cache_key = result['cache_key']
-        pixmap = result['pixmap']
+        image = result['image']
         error = result['error']
-        if cache_key not in self.pending_requests: return
-        request_info = self.pending_requests[cache_key]
-        if error: print(f"Resim indirilemedi ({cache_key[0]}): {error}")
-        elif pixmap and not pixmap.isNull():
-            self.parent_player.pixmap_cache[cache_key] = pixmap
-            for widget in request_info['widgets']:
-                try:
-                    if hasattr(widget, 'set_image'): widget.set_image(pixmap)
-                    elif isinstance(widget, QLabel): widget.setPixmap(pixmap)
-                except RuntimeError:
-                    print(f"Widget (URL: {cache_key[0][:30]}...) resim yüklenmeden silindi, atlanıyor.")
-                    continue
-
-            if request_info['callback']:
-                try: request_info['callback'](pixmap, result['dominant_color'])
-                except RuntimeError: pass
+        if cache_key in self.pending_requests:
+            request_info = self.pending_requests.pop(cache_key)
+            if error: print(f"Resim indirilemedi ({cache_key[0]}): {error}")
+            elif image is not None:
+                convert_start = time.perf_counter()
+                pixmap = QPixmap.fromImage(image)
+                convert_ms = (time.perf_counter() - convert_start) * 1000
+                self._record_timing(cache_key[0], request_info['enqueued_at'], result, convert_ms)
+                self.parent_player.pixmap_cache[cache_key] = pixmap
+                if result['dominant_color']: self.dominant_colors[cache_key[0]] = result['dominant_color']
+                self._deliver(cache_key, pixmap, request_info['widgets'], request_info['callback'], self.dominant_colors.get(cache_key[0]))
+                disk = result['disk']
+                if disk and not disk['fresh']:
+                    # Süresi dolmuş disk kopyası gösterildi; arka planda koşullu istekle doğrulanır, değiştiyse yeniden teslim edilir.
+                    self._enqueue(cache_key, dict(request_info, validators={'etag': disk['etag'], 'last_modified': disk['last_modified']},
+                                                  want_color=False, check_disk=False), self.PRIORITY_NORMAL)
+        if self.in_flight == 0 and not self.high_priority_queue and not self.normal_priority_queue: self._report_batch()
+
+    def _record_timing(self, url, enqueued_at, result, convert_ms):
+        self.timings.append({'url': url, 'source': 'disk' if result['disk'] else 'network', 'wait_ms': (result['started_at'] - enqueued_at) * 1000, 'fetch_ms': result['fetch_ms'],
+                             'decode_ms': result['decode_ms'], 'convert_ms': convert_ms})
+        self._unreported += 1
+
+    def _report_batch(self):
+        """Kuyruk boşaldığında son yüklenen resimlerin süre özetini tek satırda yazdırır."""
+        if not self._unreported: return
+        summary = self.stats(last=self._unreported)
+        self._unreported = 0
+        print(f"{summary['images']} resim yüklendi ({summary['from_disk']} diskten): kuyrukta bekleme ort. {summary['wait_ms']['mean']:.0f} ms "
+              f"(p95 {summary['wait_ms']['p95']:.0f}), okuma/indirme ort. {summary['fetch_ms']['mean']:.0f} ms, çözme ort. {summary['decode_ms']['mean']:.1f} ms "
+              f"(p95 {summary['decode_ms']['p95']:.1f}), QPixmap'e dönüştürme ort. {summary['convert_ms']['mean']:.2f} ms")
+
+    def stats(self, last=None):
+        """Son yüklemelerin resim başına kuyruk bekleme, indirme, çözme ve QPixmap'e dönüştürme sürelerini (ms) özetler."""
+        timings = list(self.timings)[-last:] if last else list(self.timings)
+        summary = {'images': len(timings), 'from_disk': sum(1 for timing in timings if timing['source'] == 'disk'), 'in_flight': self.in_flight,
+                   'queued': len(self.high_priority_queue) + len(self.normal_priority_queue)}
+        for name in ('wait_ms', 'fetch_ms', 'decode_ms', 'convert_ms'):
+            values = sorted(timing[name] for timing in timings)
+            summary[name] = {'mean': sum(values) / len(values), 'p95': values[min(len(values) - 1, int(len(values) * 0.95))]} if values else {'mean': 0.0, 'p95': 0.0}
+        return summary
+
+    def _color_for(self, url, pixmap):
+        """URL'nin önbellekteki baskın rengini döndürür; yoksa küçültülmüş bir kopyadan bir kez hesaplar."""
+        color = self.dominant_colors.get(url)
+        if color is None:
+            try: color = dominant_color(pixmap.toImage())
+            except Exception: color = None
+            color = self.dominant_colors[url] = color or (40, 40, 40)
+        return color
+
+    def _deliver(self, cache_key, pixmap, widgets, callback, dominant_color):
+        for widget in widgets:
+            try:
+                if hasattr(widget, 'set_image'): widget.set_image(pixmap)
+                elif isinstance(widget, QLabel): widget.setPixmap(pixmap)
+                self.parent_player.pixmap_cache.pin(cache_key, widget)
+            except RuntimeError:
+                print(f"Widget (URL: {cache_key[0][:30]}...) resim yüklenmeden silindi, atlanıyor.")
+                continue
 
-        del self.pending_requests[cache_key]
+        if callback:
+            try: callback(pixmap, dominant_color)
+            except RuntimeError: pass
 
     def cancel_normal_priority_jobs(self):
         print(f"İptal ediliyor: {len(self.normal_priority_queue)} normal öncelikli resim isteği.")
@@ -163,6 +327,13 @@ class ImageLoader:
                 del self.pending_requests[cache_key]
         self.normal_priority_queue.clear()
 
+    def shutdown(self):
+        """Bekleyen istekleri bırakır, çalışan işlerin bitmesini bekler ve disk önbelleğini kapatır."""
+        self.high_priority_queue.clear(); self.normal_priority_queue.clear(); self.pending_requests.clear()
+        self.threadpool.clear()
+        self.threadpool.waitForDone()
+        self.thumbnail_cache.close()
+
 
 class Worker(QThread):
     result = pyqtSignal(object)
@@ -178,6 +349,16 @@ class Worker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
+class DiscoverWorker(Worker):
+    """Keşfet yenilemesini çalıştırır ve her kategori araması biter bitmez section_ready sinyali yayar."""
+    section_ready = pyqtSignal(str, object)
+    def run(self):
+        try:
+            res = self.target(*self.args, on_section=self.section_ready.emit)
+            self.result.emit(res)
+        except Exception as e:
+            self.error.emit(str(e))
+
 class SongItemWidget(QWidget):
     def __init__(self, song_data, parent_player):
         super().__init__()
@@ -343,8 +524,9 @@ class CreatePlaylistDialog(QDialog):
     def get_data(self): return self.name_input.text(), self.new_cover_path
 
 class SettingsDialog(QDialog):
-    def __init__(self, current_settings, parent=None):
+    def __init__(self, current_settings, parent=None, cache_manifest=None):
         super().__init__(parent); self.setWindowTitle("Ayarlar"); self.setMinimumWidth(400); self.settings = current_settings
+        self.cache_manifest = cache_manifest
         layout = QVBoxLayout(self); form_layout = QFormLayout()
         self.theme_combo = QComboBox()
         self.themes = {"Koyu": "dark", "Sade Açık": "light", "Okyanus Mavisi": "ocean", "Synthwave Moru": "synthwave"}
@@ -356,6 +538,36 @@ class SettingsDialog(QDialog):
         self.auto_download_check = QCheckBox()
         self.auto_download_check.setChecked(self.settings.get('auto_download', True))
         form_layout.addRow("Çalınan şarkıları otomatik önbelleğe al:", self.auto_download_check)
+        self.prefetch_depth_spin = QSpinBox(); self.prefetch_depth_spin.setRange(0, 5)
+        self.prefetch_depth_spin.setValue(self.settings.get('prefetch_depth', 2))
+        form_layout.addRow("Önceden hazırlanacak şarkı sayısı:", self.prefetch_depth_spin)
+        self.prefetch_audio_check = QCheckBox(); self.prefetch_audio_check.setChecked(self.settings.get('prefetch_audio', False))
+        form_layout.addRow("Sıradaki şarkıları önceden önbelleğe al:", self.prefetch_audio_check)
+        self.gapless_check = QCheckBox(); self.gapless_check.setChecked(self.settings.get('gapless', True))
+        form_layout.addRow("Şarkılar arasında boşluksuz geçiş:", self.gapless_check)
+        self.discover_categories_edit = QPlainTextEdit("\n".join(self.settings.get('discover_categories', []))); self.discover_categories_edit.setFixedHeight(90)
+        self.discover_categories_edit.setPlaceholderText("Her satıra bir kategori")
+        form_layout.addRow("Keşfet kategorileri:", self.discover_categories_edit)
+        self.cache_quota_spin = QSpinBox(); self.cache_quota_spin.setRange(0, 512000); self.cache_quota_spin.setSingleStep(256)
+        self.cache_quota_spin.setSuffix(" MB"); self.cache_quota_spin.setSpecialValueText("Sınırsız")
+        self.cache_quota_spin.setValue(self.settings.get('cache_quota_mb', 0))
+        form_layout.addRow("Önbellek disk kotası:", self.cache_quota_spin)
+        self.eviction_policies = {"En uzun süredir çalınmayan (LRU)": "lru", "En az çalınan (LFU)": "lfu"}
+        self.eviction_combo = QComboBox(); self.eviction_combo.addItems(self.eviction_policies.keys())
+        current_policy_key = next((key for key, value in self.eviction_policies.items() if value == self.settings.get('cache_eviction_policy')), "En uzun süredir çalınmayan (LRU)")
+        self.eviction_combo.setCurrentText(current_policy_key); form_layout.addRow("Kota aşılınca silinecekler:", self.eviction_combo)
+        self.cache_modes = {"Kaynak sesi koru (hızlı, yeniden kodlama yok)": "remux", "Opus'a dönüştür (192 kbps)": "transcode"}
+        self.cache_mode_combo = QComboBox(); self.cache_mode_combo.addItems(self.cache_modes.keys())
+        current_mode_key = next((key for key, value in self.cache_modes.items() if value == self.settings.get('cache_mode')), "Kaynak sesi koru (hızlı, yeniden kodlama yok)")
+        self.cache_mode_combo.setCurrentText(current_mode_key); form_layout.addRow("Önbellek kayıt biçimi:", self.cache_mode_combo)
+        self.thumbnail_cache_spin = QSpinBox(); self.thumbnail_cache_spin.setRange(10, 10240); self.thumbnail_cache_spin.setSingleStep(50)
+        self.thumbnail_cache_spin.setSuffix(" MB"); self.thumbnail_cache_spin.setValue(self.settings.get('thumbnail_cache_mb', 200))
+        form_layout.addRow("Kapak resmi önbelleği:", self.thumbnail_cache_spin)
+        self.pixmap_cache_spin = QSpinBox(); self.pixmap_cache_spin.setRange(16, 4096); self.pixmap_cache_spin.setSingleStep(16)
+        self.pixmap_cache_spin.setSuffix(" MB"); self.pixmap_cache_spin.setValue(self.settings.get('pixmap_cache_mb', 128))
+        form_layout.addRow("Bellekteki resim önbelleği:", self.pixmap_cache_spin)
+        self.cache_usage_label = QLabel(); self.update_cache_usage_label()
+        form_layout.addRow("Önbellek kullanımı:", self.cache_usage_label)
         layout.addLayout(form_layout); layout.addSpacing(20)
         self.clear_cache_btn = QPushButton("Önbelleği Temizle"); self.clear_cache_btn.setObjectName("clear_cache_btn")
         self.clear_cache_btn.clicked.connect(self.clear_cache); layout.addWidget(self.clear_cache_btn)
@@ -363,30 +575,56 @@ class SettingsDialog(QDialog):
         save_btn = button_box.button(QDialogButtonBox.StandardButton.Save); save_btn.setText("Kaydet ve Uygula"); save_btn.setObjectName("dialog_accept_btn")
         button_box.button(QDialogButtonBox.StandardButton.Cancel).setText("İptal")
         button_box.accepted.connect(self.accept); button_box.rejected.connect(self.reject); layout.addWidget(button_box)
+    def update_cache_usage_label(self):
+        if not self.cache_manifest: self.cache_usage_label.setText("-"); return
+        stats = self.cache_manifest.stats()
+        self.cache_usage_label.setText(f"{stats['bytes'] / (1024 * 1024):.1f} MB ({stats['entries']} şarkı)")
+
     def clear_cache(self):
         path = 'music_cache'
-        if not os.path.exists(path) or not os.listdir(path):
+        is_empty = self.cache_manifest.stats()['entries'] == 0 if self.cache_manifest else (not os.path.exists(path) or not os.listdir(path))
+        if is_empty:
             show_custom_messagebox(self, QMessageBox.Icon.Information, "Bilgi", "Önbellek zaten boş.", QMessageBox.StandardButton.Ok)
             return
         reply = show_custom_messagebox(self, QMessageBox.Icon.Question, "Onay", "Tüm önbelleğe alınmış şarkıları silmek istediğinize emin misiniz? Bu işlem geri alınamaz.", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             total_size = 0; file_count = 0
-            for filename in os.listdir(path):
-                file_path = os.path.join(path, filename)
-                try: total_size += os.path.getsize(file_path); os.remove(file_path); file_count += 1
-                except Exception as e: print(f"Dosya silinemedi: {file_path}, Hata: {e}")
+            if self.cache_manifest:
+                file_count, total_size = self.cache_manifest.clear()
+            else:
+                for filename in os.listdir(path):
+                    file_path = os.path.join(path, filename)
+                    try: total_size += os.path.getsize(file_path); os.remove(file_path); file_count += 1
+                    except Exception as e: print(f"Dosya silinemedi: {file_path}, Hata: {e}")
             size_mb = total_size / (1024 * 1024)
+            self.update_cache_usage_label()
             if hasattr(self.parent(), 'pixmap_cache'):
                 self.parent().pixmap_cache.clear()
+                self.parent().image_loader.thumbnail_cache.clear()
                 print("Resim önbelleği temizlendi.")
             show_custom_messagebox(self, QMessageBox.Icon.Information, "Başarılı", f"{file_count} dosya silindi. Toplam {size_mb:.2f} MB alan boşaltıldı.", QMessageBox.StandardButton.Ok)
     def get_settings(self):
         selected_theme_name = self.theme_combo.currentText()
-        return {
+        return dict(self.settings, **{
             'theme': self.themes[selected_theme_name],
             'show_right_panel': self.show_panel_check.isChecked(),
-            'auto_download': self.auto_download_check.isChecked()
-        }
+            'auto_download': self.auto_download_check.isChecked(),
+            'prefetch_depth': self.prefetch_depth_spin.value(),
+            'prefetch_audio': self.prefetch_audio_check.isChecked(),
+            'gapless': self.gapless_check.isChecked(),
+            'cache_quota_mb': self.cache_quota_spin.value(),
+            'cache_eviction_policy': self.eviction_policies[self.eviction_combo.currentText()],
+            'cache_mode': self.cache_modes[self.cache_mode_combo.currentText()],
+            'thumbnail_cache_mb': self.thumbnail_cache_spin.value(),
+            'pixmap_cache_mb': self.pixmap_cache_spin.value(),
+            'discover_categories': [line.strip() for line in self.discover_categories_edit.toPlainText().splitlines() if line.strip()]
+        })
+
+def format_age(seconds):
+    if seconds < 60: return "az önce"
+    if seconds < 3600: return f"{int(seconds // 60)} dakika önce"
+    if seconds < 86400: return f"{int(seconds // 3600)} saat önce"
+    return f"{int(seconds // 86400)} gün önce"
 
 def show_custom_messagebox(parent, icon, title, text, buttons):
     msg_box = QMessageBox(parent)
@@ -407,16 +645,27 @@ def show_custom_messagebox(parent, icon, title, text, buttons):
 
 class MusicPlayer(QWidget):
     song_finished_signal = pyqtSignal()
+    playback_started_signal = pyqtSignal()
+    stream_error_signal = pyqtSignal()
     SEARCH_PAGE_SIZE = 20
 
     def __init__(self):
         super().__init__()
-        self.music_engine = MusicEngine()
-        self.db = load_db()
+        with startup_profiler.phase('MusicEngine()'): self.music_engine = MusicEngine()
+        with startup_profiler.phase('load_db'): self.db = load_db()
+        self.apply_cache_settings(self.db['settings'])
+        self.music_engine.set_discover_categories(self.db['settings']['discover_categories'])
+        self.download_manager = DownloadManager(self.music_engine, max_concurrent=self.db['settings']['max_concurrent_downloads'])
+        self.prefetcher = Prefetcher(self.music_engine, self.download_manager, depth=self.db['settings']['prefetch_depth'],
+                                     cache_audio=self.db['settings']['prefetch_audio'], budget_mb_per_hour=self.db['settings']['prefetch_budget_mb'])
+        self.gap_meter = TrackGapMeter()
+        self.gap_meter.add_listener(lambda gap_ms, was_ready: print(f"Şarkılar arası boşluk: {gap_ms:.0f} ms ({'önceden hazır' if was_ready else 'hazır değil'})"))
         self.image_loader = ImageLoader(self)
-        self.pixmap_cache = {}
+        self.pixmap_cache = PixmapCache(max_bytes=self.db['settings']['pixmap_cache_mb'] * 1024 * 1024, sizeof=pixmap_bytes, is_pinned=widget_on_screen)
         self.current_theme_name = self.db['settings']['theme']
         self.discover_category_widgets = []
+        self.discover_sections = {}; self.discover_data_queue = []; self.discover_applied_sections = set()
+        self.discover_refreshing = False
         self.active_threads = []
         self.current_song_info = None
         self.current_playlist_key = None
@@ -425,20 +674,65 @@ class MusicPlayer(QWidget):
         self.loop_mode = 0
         self.last_search_query = ""
         self.last_search_filter = "songs"
-        self.current_search_limit = self.SEARCH_PAGE_SIZE
         self.welcome_movie = None # welcome.gif için
-        self._initialize_player()
-        self._setup_ui()
-        self._connect_signals()
-        self._load_initial_state()
+        self.streaming_video_id = None
+        self.stream_retry_used = False
+        self.last_known_position = 0
+        self.next_media_player = None
+        self.armed_video_id = None
+        self.armed_is_stream = False
+        with startup_profiler.phase('_initialize_player'): self._initialize_player()
+        with startup_profiler.phase('_setup_ui'): self._setup_ui()
+        with startup_profiler.phase('_connect_signals'): self._connect_signals()
+        with startup_profiler.phase('_load_initial_state'): self._load_initial_state()
+        # Ağ istemcileri ve yt-dlp pencere açıldıktan sonra arka planda hazırlanır; ilk kullanan iş parçacığı hazır olmalarını bekler.
+        self.start_worker(Worker, lambda elapsed: None, lambda e: print(f"MusicEngine arka planda hazırlanamadı: {e}"), self.warm_up_engine)
+
+    def warm_up_engine(self):
+        start = time.perf_counter()
+        elapsed = self.music_engine.warm_up()
+        startup_profiler.record('MusicEngine.warm_up', start, thread='engine-warmup')
+        return elapsed
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not startup_profiler.has_mark('first_paint'):
+            startup_profiler.mark('first_paint')
+            # Boyamadan sonraki ilk olay döngüsü turu, pencerenin girdiye yanıt verebildiği ilk an olarak ölçülür.
+            QTimer.singleShot(0, self.on_startup_interactive)
+
+    def on_startup_interactive(self):
+        startup_profiler.mark('interactive')
+        if not startup_profiler.enabled: return
+        # Profil modunda pencere kapatılır; closeEvent arka plan işlerini (warm_up dahil) bekler, böylece rapora girerler.
+        self.close()
+        startup_profiler.print_summary()
+        print(f"Açılış profili yazıldı: {startup_profiler.write()}")
 
     def _initialize_player(self):
-        self.vlc_instance = vlc.Instance()
+        import vlc
+        with startup_profiler.phase('vlc.Instance()'): self.vlc_instance = vlc.Instance()
         self.media_player = self.vlc_instance.media_player_new()
-        self.media_player.event_manager().event_attach(vlc.EventType.MediaPlayerEndReached, self.handle_song_end)
+        self._attach_player_events(self.media_player)
         self.progress_timer = QTimer(self)
         self.progress_timer.setInterval(200)
 
+    def _player_event_handlers(self):
+        import vlc
+        return {
+            vlc.EventType.MediaPlayerEndReached: self.handle_song_end,
+            vlc.EventType.MediaPlayerEncounteredError: self.handle_media_error,
+            vlc.EventType.MediaPlayerPlaying: self.handle_playback_started,
+        }
+
+    def _attach_player_events(self, player):
+        for event_type, handler in self._player_event_handlers().items():
+            player.event_manager().event_attach(event_type, handler)
+
+    def _detach_player_events(self, player):
+        for event_type in self._player_event_handlers():
+            player.event_manager().event_detach(event_type)
+
     def _setup_ui(self):
         self.setWindowTitle("Lei-Music"); self.setWindowIcon(QIcon("icons/app_icon.png")); self.setGeometry(100, 100, 1400, 800)
         main_layout = QVBoxLayout(self); main_layout.setContentsMargins(0, 0, 0, 0); main_layout.setSpacing(0)
@@ -454,6 +748,8 @@ class MusicPlayer(QWidget):
     def _connect_signals(self):
         self.progress_timer.timeout.connect(self.update_ui)
         self.song_finished_signal.connect(self.safe_play_next_song)
+        self.stream_error_signal.connect(self.on_stream_error)
+        self.playback_started_signal.connect(self.on_playback_started)
         self.home_button.clicked.connect(self.show_discover_page); self.settings_button.clicked.connect(self.open_settings)
         self.new_playlist_btn.clicked.connect(self.create_new_playlist)
         self.playlists_list.itemClicked.connect(lambda item: self.show_playlist(item.data(Qt.ItemDataRole.UserRole)))
@@ -466,15 +762,18 @@ class MusicPlayer(QWidget):
         self.prev_btn.clicked.connect(self.play_prev_song); self.position_slider.sliderReleased.connect(self.on_slider_released)
         self.volume_slider.valueChanged.connect(self.set_volume); self.loop_button.clicked.connect(self.toggle_loop_mode)
         self.fav_button.clicked.connect(self.toggle_favorite); self.info_button.clicked.connect(self.toggle_right_panel)
+        self.download_manager.job_progress.connect(self.on_download_progress)
+        self.download_manager.job_finished.connect(self.on_download_finished)
+        self.download_manager.queue_changed.connect(self.on_download_queue_changed)
 
     def _load_initial_state(self):
         screen_geometry = self.screen().availableGeometry()
         self.move(int((screen_geometry.width() - self.width()) / 2), int((screen_geometry.height() - self.height()) / 2))
-        self.apply_theme(self.db['settings']['theme'])
-        self.update_playlists_list()
+        with startup_profiler.phase('apply_theme'): self.apply_theme(self.db['settings']['theme'])
+        with startup_profiler.phase('update_playlists_list'): self.update_playlists_list()
         show_panel = self.db['settings'].get('show_right_panel', True)
         self.right_panel.setVisible(show_panel); self.info_button.setChecked(show_panel)
-        self.show_discover_page()
+        with startup_profiler.phase('show_discover_page'): self.show_discover_page()
         if show_panel and not self.current_song_info:
             self.show_welcome_panel()
 
@@ -517,6 +816,8 @@ class MusicPlayer(QWidget):
         self.discover_page_scroll = QScrollArea(); self.discover_page_scroll.setWidgetResizable(True); self.discover_page_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.discover_page = QWidget(); self.discover_page_layout = QVBoxLayout(self.discover_page)
         self.discover_page_layout.setAlignment(Qt.AlignmentFlag.AlignTop); self.discover_page_layout.setSpacing(25)
+        self.discover_status_label = QLabel(); self.discover_status_label.setStyleSheet("font-size: 11px; padding: 0 10px;"); self.discover_status_label.setVisible(False)
+        self.discover_page_layout.addWidget(self.discover_status_label)
         self.discover_page_scroll.setWidget(self.discover_page)
         self.stacked_widget.addWidget(self.center_song_list_page); self.stacked_widget.addWidget(loading_widget); self.stacked_widget.addWidget(self.discover_page_scroll)
         layout.addWidget(search_widget); layout.addWidget(self.stacked_widget); return panel
@@ -570,12 +871,16 @@ class MusicPlayer(QWidget):
         self.info_button = QPushButton(icon=QIcon("icons/info.png")); self.info_button.setCheckable(True); self.info_button.setFixedSize(32, 32)
         self.loop_button = QPushButton(); self.update_loop_button_style()
         self.volume_slider = QSlider(Qt.Orientation.Horizontal); self.volume_slider.setRange(0, 100); self.volume_slider.setValue(100); self.volume_slider.setFixedWidth(120)
+        self.download_status_label = QLabel(); self.download_status_label.setObjectName("time_label"); self.download_status_label.setVisible(False)
+        right_layout.addWidget(self.download_status_label)
         right_layout.addWidget(self.info_button); right_layout.addWidget(self.loop_button); right_layout.addWidget(self.volume_slider)
         layout.addWidget(left_widget, 2); layout.addWidget(center_widget, 3); layout.addWidget(right_widget, 2)
         return widget
 
     def start_worker(self, worker_class, on_finish, on_error, target_func, *args):
-        thread = worker_class(target_func, *args)
+        self.run_thread(worker_class(target_func, *args), on_finish, on_error)
+
+    def run_thread(self, thread, on_finish, on_error):
         thread.result.connect(on_finish); thread.error.connect(on_error)
         thread.finished.connect(lambda: self.active_threads.remove(thread) if thread in self.active_threads else None)
         self.active_threads.append(thread); thread.start()
@@ -585,29 +890,142 @@ class MusicPlayer(QWidget):
         if hasattr(self, 'play_pause_btn'): self.update_play_pause_icons()
             
     def play_song_by_id(self, video_id):
+        if self.next_media_player and self.armed_video_id == video_id:
+            self.swap_to_armed_player(); return
         self.progress_timer.stop(); self.media_player.stop()
         self.update_player_bar_info()
+        self.streaming_video_id = None; self.stream_retry_used = False; self.last_known_position = 0
         cached_path = self.music_engine.check_cache(video_id)
+        self.gap_meter.mark_next_ready(bool(cached_path) or self.music_engine.has_stream_url(video_id))
         if cached_path:
-            print(f"'{video_id}' önbellekten oynatılıyor."); self.play_media(cached_path); return
+            print(f"'{video_id}' önbellekten oynatılıyor."); self.music_engine.mark_played(video_id); self.play_media(cached_path); return
         print(f"'{video_id}' stream ediliyor...")
-        self.start_worker(Worker, self.on_stream_url_received, self.show_error_message, self.music_engine.get_stream_url, video_id)
+        self.streaming_video_id = video_id
         if self.db['settings'].get('auto_download', True):
-            self.start_worker(Worker, lambda r: None, lambda e: print(f"Cache hatası: {e}"), self.music_engine.download_and_cache_song, video_id)
+            self.start_worker(Worker, lambda r: self.on_playback_resolved(video_id, r), self.show_error_message, self.music_engine.resolve_for_playback, video_id)
+        else:
+            self.start_worker(Worker, self.on_stream_url_received, self.show_error_message, self.music_engine.get_stream_url, video_id)
 
     def on_stream_url_received(self, stream_url):
         if stream_url: self.play_media(stream_url)
         else: self.show_error_message("Şarkı stream edilemedi.")
 
-    def play_media(self, media_path_or_url):
+    def on_playback_resolved(self, video_id, playback):
+        """Tek çıkarımın sonucu: VLC yerel proxy'den çalar, proxy aynı baytları önbelleğe yazar; ikinci bir indirme yapılmaz."""
+        if not playback: self.show_error_message("Şarkı stream edilemedi."); return
+        if self.download_manager.is_queued(video_id):
+            self.download_manager.promote(video_id, info=playback['info']); self.play_media(playback['url']); return
+        self.play_media(self.music_engine.tee_stream(video_id, playback, keep=(self.armed_video_id,)))
+
+    def handle_media_error(self, event): self.stream_error_signal.emit()
+
+    def on_playback_started(self):
+        self.gap_meter.mark_started()
+        self.arm_next_player()
+
+    def add_track_gap_hook(self, callback):
+        """Enstrümantasyon kancası: callback(gap_ms, was_ready) her şarkı geçişinde ölçülen boşlukla çağrılır."""
+        self.gap_meter.add_listener(callback)
+
+    def _next_video_id(self):
+        if not self.current_playlist or not self.current_song_info: return None
+        if self.loop_mode == 2: return self.current_song_info.get('id')
+        indices = Prefetcher.upcoming_indices(len(self.current_playlist), self.current_song_index, self.loop_mode, 1)
+        return self.current_playlist[indices[0]].get('id') if indices else None
+
+    def arm_next_player(self):
+        """Gapless: sıradaki şarkıyı ikinci bir VLC oynatıcısında açar, arabelleğe alır ve duraklatılmış olarak bekletir."""
+        if not self.db['settings'].get('gapless', True): self.disarm_next_player(); return
+        video_id = self._next_video_id()
+        if self.next_media_player and video_id and video_id == self.armed_video_id: return
+        # Sıradaki şarkı değiştiyse eski hazır oynatıcı, yenisi hazırlanamasa bile bırakılır; yoksa yanlış şarkıya geçilirdi.
+        self.disarm_next_player()
+        if not video_id: return
+        cached_path = self.music_engine.check_cache(video_id)
+        stream = None if cached_path else self.music_engine.peek_stream(video_id)
+        if not cached_path and not stream: return
+        source = cached_path
+        if not source:
+            # Sıradaki şarkı da proxy'den çalınır; böylece gapless geçişle ulaşılan şarkılar da önbelleğe yazılır.
+            if self.db['settings'].get('auto_download', True) and not self.download_manager.is_queued(video_id):
+                source = self.music_engine.tee_stream(video_id, stream, keep=(self.streaming_video_id,))
+            else: source = stream['url']
+        media = self.vlc_instance.media_new(source); media.add_option(":start-paused")
+        player = self.vlc_instance.media_player_new(); player.set_media(media)
+        player.audio_set_volume(self.volume_slider.value()); player.play()
+        self.next_media_player = player; self.armed_video_id = video_id; self.armed_is_stream = not cached_path
+        print(f"Gapless: '{video_id}' sıradaki şarkı olarak hazırlandı.")
+
+    def disarm_next_player(self):
+        if self.next_media_player: self.next_media_player.stop(); self.next_media_player.release()
+        self.next_media_player = None; self.armed_video_id = None
+
+    def swap_to_armed_player(self):
+        """Hazır bekleyen oynatıcıyı etkin oynatıcı yapar; yeni medya oluşturulmadığı için geçişte boşluk oluşmaz."""
+        video_id = self.armed_video_id
+        self.progress_timer.stop()
+        self.gap_meter.mark_next_ready(True)
+        old_player, self.media_player = self.media_player, self.next_media_player
+        self.next_media_player = None; self.armed_video_id = None
+        self._attach_player_events(self.media_player)
+        self.media_player.set_pause(0)
+        self._detach_player_events(old_player); old_player.stop(); old_player.release()
+        print(f"Gapless: '{video_id}' hazır oynatıcıdan başlatıldı.")
+        self.update_player_bar_info()
+        self.streaming_video_id = video_id if self.armed_is_stream else None
+        if not self.armed_is_stream: self.music_engine.mark_played(video_id)
+        elif self.db['settings'].get('auto_download', True):
+            # Proxy zaten önbelleğe yazıyorsa enqueue bir şey yapmaz; kuyruktaysa önceliği çalan şarkıya yükseltilir.
+            title = self.current_song_info.get('title') if self.current_song_info else None
+            self.download_manager.enqueue(video_id, title, DownloadManager.PRIORITY_CURRENT)
+        self.stream_retry_used = False; self.last_known_position = 0
+        self.progress_timer.start(); self.update_play_pause_icons(); self.update_fav_button_status()
+
+    def on_stream_error(self):
+        """Stream sırasında VLC hata verirse (örn. süresi dolmuş URL'de 403) URL'yi bir kez yeniden çözer ve kalınan yerden devam eder."""
+        video_id = self.streaming_video_id
+        if not video_id:
+            cached_id = self.current_song_info.get('id') if self.current_song_info else None
+            if cached_id and self.music_engine.forget_cached(cached_id):
+                print(f"'{cached_id}' önbellek dosyası bozuk, dosya silinip stream ediliyor...")
+                self.play_song_by_id(cached_id)
+            elif cached_id:
+                print(f"'{cached_id}' önbellek dosyası sağlam, geçici bir oynatma hatası oluştu; dosya korunuyor.")
+                self.show_error_message("Şarkı çalınamadı.")
+            return
+        if self.stream_retry_used:
+            self.show_error_message("Şarkı stream edilemedi."); return
+        self.stream_retry_used = True
+        resume_ms = self.last_known_position
+        teed_url = self.music_engine.teed_url(video_id)
+        if teed_url:
+            # Süresi dolan URL'yi proxy kendisi yeniler; aynı oturumdan devam edilir, şarkı ikinci kez indirilmez.
+            print(f"'{video_id}' stream hatası, proxy oturumundan {self.format_time(resume_ms)} konumundan devam ediliyor...")
+            self.play_media(teed_url, start_ms=resume_ms); return
+        print(f"'{video_id}' stream hatası, URL yeniden çözülüyor ({self.format_time(resume_ms)} konumundan devam edilecek)...")
+        self.start_worker(Worker, lambda url: self.on_stream_url_refreshed(video_id, url, resume_ms), self.show_error_message,
+                          self.music_engine.get_stream_url, video_id, True)
+
+    def on_stream_url_refreshed(self, video_id, stream_url, resume_ms):
+        if video_id != self.streaming_video_id: return
+        if stream_url: self.play_media(stream_url, start_ms=resume_ms)
+        else: self.show_error_message("Şarkı stream edilemedi."); return
+        if self.db['settings'].get('auto_download', True):
+            title = self.current_song_info.get('title') if self.current_song_info else None
+            self.download_manager.enqueue(video_id, title, DownloadManager.PRIORITY_CURRENT)
+
+    def play_media(self, media_path_or_url, start_ms=0):
         if hasattr(self, 'welcome_movie') and self.welcome_movie: self.welcome_movie.stop(); self.welcome_movie = None
         media = self.vlc_instance.media_new(media_path_or_url)
+        if start_ms > 0: media.add_option(f"start-time={start_ms / 1000:.3f}")
         self.media_player.set_media(media); self.media_player.play(); self.progress_timer.start()
         self.update_play_pause_icons(); self.update_fav_button_status()
 
     def update_ui(self):
         if not self.media_player.get_media() or self.position_slider.isSliderDown() or not self.media_player.is_playing(): return
         position = self.media_player.get_time()
+        self.last_known_position = position
+        if not self.next_media_player and self.media_player.get_length() - position < 15000: self.arm_next_player()
         self.position_slider.setValue(position); self.time_label.setText(self.format_time(position))
     
     def format_time(self, ms):
@@ -615,7 +1033,9 @@ class MusicPlayer(QWidget):
         total_seconds = int(ms / 1000)
         return f"{(total_seconds // 60):02d}:{(total_seconds % 60):02d}"
 
-    def handle_song_end(self, event): self.song_finished_signal.emit()
+    def handle_song_end(self, event): self.gap_meter.mark_ended(); self.song_finished_signal.emit()
+
+    def handle_playback_started(self, event): self.playback_started_signal.emit()
 
     def toggle_play_pause(self):
         if self.media_player.get_media(): self.media_player.pause(); self.update_play_pause_icons()
@@ -623,17 +1043,21 @@ class MusicPlayer(QWidget):
     def on_slider_released(self):
         if self.media_player.get_media(): self.media_player.set_time(self.position_slider.value())
             
-    def set_volume(self, volume): self.media_player.audio_set_volume(volume)
+    def set_volume(self, volume):
+        self.media_player.audio_set_volume(volume)
+        if self.next_media_player: self.next_media_player.audio_set_volume(volume)
     
     def toggle_loop_mode(self):
         self.loop_mode = (self.loop_mode + 1) % 3
         self.update_loop_button_style()
+        self.prefetcher.update(self.current_playlist, self.current_song_index, self.loop_mode)
 
     def safe_play_next_song(self):
         if not self.current_playlist: return
         if self.loop_mode == 2: self.play_song_from_current_playlist(); return
         is_last_song = self.current_song_index >= len(self.current_playlist) - 1
         if self.loop_mode == 0 and is_last_song:
+            self.gap_meter.cancel()
             self.progress_timer.stop(); self.media_player.stop(); self.update_play_pause_icons(); return
         self.current_song_index = (self.current_song_index + 1) % len(self.current_playlist)
         self.play_song_from_current_playlist()
@@ -665,6 +1089,7 @@ class MusicPlayer(QWidget):
             self.current_song_info = self.current_playlist[self.current_song_index]
             self.center_song_list.setCurrentRow(self.current_song_index)
             self.play_song_by_id(self.current_song_info['id'])
+            self.prefetcher.update(self.current_playlist, self.current_song_index, self.loop_mode)
             
     def show_error_message(self, error_message):
         self.loading_movie.stop(); self.stacked_widget.setCurrentIndex(0)
@@ -692,8 +1117,8 @@ class MusicPlayer(QWidget):
         self.artist_name_label.setText(artist_name); self.artist_bio_browser.setText("Biyografi yükleniyor...")
         thumbnail_url = self.current_song_info.get('thumbnail') if self.current_song_info else None
         if thumbnail_url:
-            self.image_loader.request_image(thumbnail_url, None, ImageLoader.PRIORITY_HIGH, 
-                                            callback=self.set_artist_image)
+            self.image_loader.request_image(thumbnail_url, None, ImageLoader.PRIORITY_HIGH,
+                                            callback=self.set_artist_image, want_color=True)
         else:
             self.artist_image_label.setPixmap(QPixmap("icons/default_cover.png").scaled(250, 250))
          
@@ -771,14 +1196,37 @@ class MusicPlayer(QWidget):
         self.fav_button.setIcon(QIcon("icons/heart-full.png") if is_favorite else QIcon("icons/heart-outline.png"))
 
     def open_settings(self):
-        dialog = SettingsDialog(self.db['settings'], self)
+        dialog = SettingsDialog(self.db['settings'], self, cache_manifest=self.music_engine.cache_manifest)
         if dialog.exec():
             new_settings = dialog.get_settings()
+            if not self.confirm_cache_quota(new_settings): new_settings['cache_quota_mb'] = self.db['settings'].get('cache_quota_mb', 0)
             self.db['settings'] = new_settings; save_db(self.db)
             self.apply_theme(new_settings['theme'])
+            self.prefetcher.configure(depth=new_settings['prefetch_depth'], cache_audio=new_settings['prefetch_audio'])
+            if not new_settings.get('gapless', True): self.disarm_next_player()
+            self.apply_cache_settings(new_settings)
+            self.image_loader.thumbnail_cache.set_max_bytes(new_settings['thumbnail_cache_mb'] * 1024 * 1024)
+            self.pixmap_cache.set_max_bytes(new_settings['pixmap_cache_mb'] * 1024 * 1024)
+            if self.music_engine.set_discover_categories(new_settings['discover_categories']) and self.discover_sections: self.refresh_discover_data()
             self.toggle_right_panel(force_state=new_settings.get('show_right_panel', True))
             show_custom_messagebox(self, QMessageBox.Icon.Information, "Ayarlar Kaydedildi", "Ayarlar başarıyla uygulandı.", QMessageBox.StandardButton.Ok)
 
+    def confirm_cache_quota(self, settings):
+        """Yeni kota şarkı silinmesine yol açacaksa kullanıcıdan onay ister; onaylanmazsa False döndürür."""
+        count, freed = self.music_engine.cache_manifest.eviction_preview(settings['cache_quota_mb'] * 1024 * 1024, settings['cache_eviction_policy'])
+        if not count: return True
+        reply = show_custom_messagebox(self, QMessageBox.Icon.Question, "Onay",
+                                       f"Yeni önbellek kotası için {count} şarkı ({freed / (1024 * 1024):.0f} MB) silinecek. Devam etmek istiyor musunuz?",
+                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return reply == QMessageBox.StandardButton.Yes
+
+    def apply_cache_settings(self, settings):
+        quota_mb = settings.get('cache_quota_mb', 0)
+        self.music_engine.set_cache_mode(settings.get('cache_mode', 'remux'))
+        # Tahliye çok sayıda dosya silebileceğinden GUI iş parçacığını bloklamaz.
+        threading.Thread(target=self.music_engine.cache_manifest.configure, args=(quota_mb * 1024 * 1024, settings.get('cache_eviction_policy', 'lru')),
+                         name="cache-quota", daemon=True).start()
+
     def create_new_playlist(self):
         dialog = CreatePlaylistDialog(self)
         if dialog.exec():
@@ -849,14 +1297,24 @@ class MusicPlayer(QWidget):
         if self.music_engine.check_cache(video_id):
             print(f"'{song_data['title']}' zaten önbellekte.")
             return
-
-        print(f"'{song_data['title']}' indirme isteği gönderildi...")
-        self.start_worker(Worker, lambda r: print(f"'{song_data['title']}' başarıyla indirildi."), 
-                          lambda e: print(f"'{song_data['title']}' indirilirken hata: {e}"), 
-                          self.music_engine.download_and_cache_song, video_id)
+        if not self.download_manager.enqueue(video_id, song_data.get('title'), DownloadManager.PRIORITY_USER):
+            print(f"'{song_data['title']}' zaten indiriliyor.")
+            return
+        print(f"'{song_data['title']}' indirme kuyruğuna eklendi...")
         show_custom_messagebox(self, QMessageBox.Icon.Information, "İndirme Başladı", 
                                f"'{song_data['title']}' arka planda indiriliyor.", QMessageBox.StandardButton.Ok)
 
+    def on_download_progress(self, video_id, percent):
+        self.download_status_label.setToolTip(f"{video_id}: %{percent:.0f}")
+
+    def on_download_finished(self, video_id, success, error):
+        if success: print(f"'{video_id}' başarıyla indirildi.")
+        else: print(f"'{video_id}' indirilemedi: {error}")
+
+    def on_download_queue_changed(self, pending, active):
+        self.download_status_label.setVisible(pending + active > 0)
+        self.download_status_label.setText(f"İndiriliyor: {active}/{pending + active}")
+
     def search_for_artist(self, artist_name):
         if not artist_name: return
         self.search_filter_combo.setCurrentText("Sanatçılar")
@@ -909,6 +1367,9 @@ class MusicPlayer(QWidget):
         download_action = menu.addAction(QIcon("icons/downloaded.png"), "Şarkıyı İndir (Önbelleğe Al)")
         if self.music_engine.check_cache(song_id):
             download_action.setText("Şarkı Zaten İndirilmiş"); download_action.setEnabled(False)
+        elif self.download_manager.is_queued(song_id):
+            download_action.setText("İndirmeyi İptal Et")
+            download_action.triggered.connect(lambda: self.download_manager.cancel(song_id))
         else:
             download_action.triggered.connect(lambda: self.download_song_from_menu(song_data))
         
@@ -951,8 +1412,13 @@ class MusicPlayer(QWidget):
 
     def populate_center_list(self, results_list):
         self.center_song_list.clear()
-        self.current_playlist = list(results_list) 
-        for i, data in enumerate(results_list):
+        self.current_playlist = []
+        self.append_center_list(results_list)
+
+    def append_center_list(self, results_list):
+        start = len(self.current_playlist)
+        self.current_playlist.extend(results_list)
+        for i, data in enumerate(results_list, start):
             item_widget = None; item_type = data.get('type')
             if item_type == 'artist': item_widget = ArtistItemWidget(data, self)
             elif item_type == 'album': item_widget = AlbumItemWidget(data, self)
@@ -973,28 +1439,33 @@ class MusicPlayer(QWidget):
         self.image_loader.cancel_normal_priority_jobs()
         self.last_search_query = query
         self.last_search_filter = api_filter 
-        self.current_search_limit = self.SEARCH_PAGE_SIZE
         self.load_more_btn.setText("Daha Fazla Yükle")
         self.stacked_widget.setCurrentIndex(1); self.loading_movie.start(); QApplication.processEvents() 
         self.start_worker(Worker, self.on_search_finished, self.show_error_message, 
-                          self.music_engine.search_ytmusic, self.last_search_query, self.current_search_limit, api_filter)
+                          self.music_engine.search_ytmusic_page, self.last_search_query, 0, self.SEARCH_PAGE_SIZE, api_filter)
 
     def load_more_songs(self):
-        if not self.last_search_query: return
-        self.current_search_limit += self.SEARCH_PAGE_SIZE
+        if not self.last_search_query or self.current_playlist_key != "search_results": return
         self.load_more_btn.setText("Yükleniyor..."); self.load_more_btn.setEnabled(False)
-        api_filter = getattr(self, 'last_search_filter', 'songs')
-        self.start_worker(Worker, self.on_search_finished, self.show_error_message, 
-                          self.music_engine.search_ytmusic, self.last_search_query, self.current_search_limit, api_filter)
+        query, api_filter = self.last_search_query, self.last_search_filter
+        self.start_worker(Worker, lambda page: self.on_more_results(page, query, api_filter), self.show_error_message, 
+                          self.music_engine.search_ytmusic_page, query, len(self.current_playlist), self.SEARCH_PAGE_SIZE, api_filter)
 
-    def on_search_finished(self, results):
+    def on_search_finished(self, page):
+        results, has_more = page
         self.loading_movie.stop()
         self.current_playlist_key = "search_results"
         self.populate_center_list(results)
         self.stacked_widget.setCurrentWidget(self.center_song_list_page)
         self.load_more_btn.setEnabled(True); self.load_more_btn.setText("Daha Fazla Yükle")
-        if len(results) < self.current_search_limit: self.load_more_btn.setVisible(False)
-        else: self.load_more_btn.setVisible(True)
+        self.load_more_btn.setVisible(has_more)
+
+    def on_more_results(self, page, query, api_filter):
+        if self.current_playlist_key != "search_results" or (query, api_filter) != (self.last_search_query, self.last_search_filter): return
+        results, has_more = page
+        self.append_center_list(results)
+        self.load_more_btn.setEnabled(True); self.load_more_btn.setText("Daha Fazla Yükle")
+        self.load_more_btn.setVisible(has_more)
 
     def show_discover_page(self):
         self.stacked_widget.setCurrentWidget(self.discover_page_scroll)
@@ -1008,18 +1479,104 @@ class MusicPlayer(QWidget):
                 if widget.image_url:
                     target_size = (140, 140) 
                     self.image_loader.request_image(widget.image_url, widget, ImageLoader.PRIORITY_NORMAL, target_size=target_size)
+            snapshot = self.music_engine.get_discover_snapshot()
+            if snapshot:
+                self.update_discover_status(snapshot)
+                if snapshot['stale']: self.refresh_discover_data()
 
     def load_discover_data(self):
+        snapshot = self.music_engine.get_discover_snapshot()
+        if snapshot:
+            print(f"Keşfet sayfası kayıtlı veriden gösteriliyor ({format_age(snapshot['age_seconds'])} alınmış).")
+            self.populate_discover_page(snapshot['sections'])
+            self.update_discover_status(snapshot)
+            if snapshot['stale']: self.refresh_discover_data()
+            return
         self.stacked_widget.setCurrentIndex(1)
         self.loading_movie.start()
-        self.start_worker(Worker, self.populate_discover_page, self.show_error_message, self.music_engine.get_ytmusic_discover_data)
+        self.refresh_discover_data()
+
+    def refresh_discover_data(self):
+        if self.discover_refreshing: return
+        self.discover_refreshing = True; self.discover_applied_sections = set()
+        self.discover_refresh_started = time.perf_counter(); self.discover_first_section_reported = False
+        if self.discover_status_label.isVisible(): self.discover_status_label.setText(self.discover_status_label.text() + " · güncelleniyor...")
+        worker = DiscoverWorker(self.music_engine.refresh_discover_data)
+        worker.section_ready.connect(self.on_discover_section_ready)
+        self.run_thread(worker, self.on_discover_refreshed, self.on_discover_refresh_failed)
+
+    def on_discover_section_ready(self, title, playlists):
+        if not self.discover_sections:
+            self.loading_movie.stop()
+            if self.current_playlist_key == "discover": self.stacked_widget.setCurrentWidget(self.discover_page_scroll)
+            while self.discover_page_layout.count() > 1:
+                child = self.discover_page_layout.takeAt(1)
+                if child.widget(): child.widget().deleteLater()
+        self._place_discover_section(title, playlists, self.music_engine.discover_categories)
+        self.discover_applied_sections.add(title)
+        if not self.discover_first_section_reported:
+            self.discover_first_section_reported = True
+            print(f"İlk Keşfet bölümü {(time.perf_counter() - self.discover_refresh_started) * 1000:.0f} ms'de gösterildi ('{title}').")
+
+    def on_discover_refreshed(self, result):
+        self.discover_refreshing = False
+        print(f"Keşfet yenilemesi {(time.perf_counter() - self.discover_refresh_started) * 1000:.0f} ms'de tamamlandı.")
+        if not self.discover_sections and not result['sections']:
+            self.populate_discover_page({})
+        else:
+            result = dict(result, changed={t: p for t, p in result['changed'].items() if t not in self.discover_applied_sections})
+            self.patch_discover_page(result)
+        self.update_discover_status(result)
+
+    def on_discover_refresh_failed(self, error_message):
+        self.discover_refreshing = False
+        if not self.discover_sections: self.show_error_message(error_message); return
+        print(f"Keşfet arka planda yenilenemedi: {error_message}")
+        snapshot = self.music_engine.get_discover_snapshot()
+        if snapshot: self.update_discover_status(snapshot)
+
+    def update_discover_status(self, snapshot):
+        text = f"Son güncelleme: {format_age(snapshot['age_seconds'])}"
+        if snapshot['stale']: text += " (eski veri)"
+        self.discover_status_label.setText(text); self.discover_status_label.setVisible(True)
+
+    def patch_discover_page(self, result):
+        """Yalnızca değişen bölümleri yeniden oluşturur; diğer bölümler ve yüklenmiş resimleri yerinde kalır."""
+        pending, self.discover_data_queue = self.discover_data_queue, []
+        for title, playlists in pending:
+            if playlists and title not in self.discover_applied_sections: self._place_discover_section(title, playlists, list(result['sections']))
+        for title in result['removed']:
+            section = self.discover_sections.pop(title, None)
+            if section: self._remove_discover_section(section)
+        order = list(result['sections'])
+        for title, playlists in result['changed'].items():
+            self._place_discover_section(title, playlists, order)
+
+    def _place_discover_section(self, title, playlists, order):
+        """Bölümü kategori sırasındaki yerine ekler; aynı başlıklı eski bölüm varsa onun yerini alır."""
+        new_section = self._create_discover_section(title, playlists)
+        old_section = self.discover_sections.get(title)
+        if old_section:
+            index = self.discover_page_layout.indexOf(old_section)
+            self._remove_discover_section(old_section)
+        else:
+            following_titles = order[order.index(title) + 1:] if title in order else []
+            following = next((self.discover_sections[t] for t in following_titles if t in self.discover_sections), None)
+            index = self.discover_page_layout.indexOf(following) if following else -1
+        self.discover_page_layout.insertWidget(index, new_section)
+        self.discover_sections[title] = new_section
+
+    def _remove_discover_section(self, section):
+        removed = set(section.category_widgets)
+        self.discover_category_widgets = [w for w in self.discover_category_widgets if w not in removed]
+        self.discover_page_layout.removeWidget(section); section.deleteLater()
 
     def populate_discover_page(self, data):
         self.loading_movie.stop()
-        self.stacked_widget.setCurrentWidget(self.discover_page_scroll)
-        self.discover_category_widgets.clear()
-        while self.discover_page_layout.count():
-            child = self.discover_page_layout.takeAt(0)
+        if self.current_playlist_key == "discover": self.stacked_widget.setCurrentWidget(self.discover_page_scroll)
+        self.discover_category_widgets.clear(); self.discover_sections = {}; self.discover_applied_sections = set()
+        while self.discover_page_layout.count() > 1:
+            child = self.discover_page_layout.takeAt(1)
             if child.widget(): child.widget().deleteLater()
         if not data:
             self.discover_page_layout.addWidget(QLabel("Keşfedilecek içerik bulunamadı."))
@@ -1028,13 +1585,13 @@ class MusicPlayer(QWidget):
         self._process_discover_batch()
 
     def _process_discover_batch(self):
-        if not hasattr(self, 'discover_data_queue') or not self.discover_data_queue:
+        if not self.discover_data_queue:
             print("Tüm keşfet kategorileri arayüze eklendi.")
             return
         section_title, playlists = self.discover_data_queue.pop(0)
-        if playlists:
-            section_widget = self._create_discover_section(section_title, playlists)
-            self.discover_page_layout.addWidget(section_widget)
+        # Bölümler başlığa göre tutulur: yenilemeden daha taze hali gelmişse kayıtlı veri atlanır, aksi halde aynı başlıklı bölümün yerini alır.
+        if playlists and section_title not in self.discover_applied_sections:
+            self._place_discover_section(section_title, playlists, self.music_engine.discover_categories)
         QTimer.singleShot(0, self._process_discover_batch)
 
     def _create_discover_section(self, title, items):
@@ -1047,13 +1604,14 @@ class MusicPlayer(QWidget):
         scroll_area.setFixedHeight(225)
         scroll_content = QWidget(); content_layout = QHBoxLayout(scroll_content)
         content_layout.setSpacing(15); content_layout.setContentsMargins(0, 0, 0, 0)
+        section_widget.category_widgets = []
         for item in items:
             browse_id = item.get('browseId')
             thumbnail_url = item['thumbnails'][-1]['url'] if item.get('thumbnails') else None
             if browse_id:
                 cat_widget = CategoryItemWidget(item['title'], thumbnail_url, browse_id, self)
                 cat_widget.clicked.connect(lambda _, bid=browse_id, pl_title=item['title']: self.on_category_clicked(bid, pl_title))
-                self.discover_category_widgets.append(cat_widget)
+                self.discover_category_widgets.append(cat_widget); section_widget.category_widgets.append(cat_widget)
                 content_layout.addWidget(cat_widget)
         content_layout.addStretch()
         scroll_area.setWidget(scroll_content)
@@ -1095,9 +1653,13 @@ class MusicPlayer(QWidget):
         elif new_state and self.current_song_info: self.fetch_artist_info(self.current_song_info.get('artist'))
         
     def closeEvent(self, event):
-        self.image_loader.processing_timer.stop()
-        self.image_loader.threadpool.clear()
-        self.image_loader.threadpool.waitForDone()
+        self.download_manager.shutdown()
+        self.prefetcher.shutdown()
+        self.music_engine.postprocess_pool.shutdown()
+        self.disarm_next_player()
+        self.music_engine.cache_manifest.flush()
+        self.image_loader.shutdown()
+        http_pool.close()
         for thread in self.active_threads:
             if thread.isRunning(): thread.quit(); thread.wait()
         event.accept()
@@ -1120,28 +1682,42 @@ def setup_initial_files():
     for name, url in icon_urls.items():
         path = os.path.join("icons", name)
         if not os.path.exists(path):
-            try:
-                print(f"İkon indiriliyor: {name}..."); r = requests.get(url, allow_redirects=True, timeout=10); r.raise_for_status()
-                with open(path, 'wb') as f: f.write(r.content)
-                print(f"İkon başarıyla indirildi: {name}")
-            except Exception as e: print(f"İkon indirilemedi: {name}, Hata: {e}")
+            with startup_profiler.phase(f"icon:{name}"):
+                try:
+                    print(f"İkon indiriliyor: {name}..."); r = http_pool.get(url, allow_redirects=True, timeout=10); r.raise_for_status()
+                    with open(path, 'wb') as f: f.write(r.content)
+                    print(f"İkon başarıyla indirildi: {name}")
+                except Exception as e: print(f"İkon indirilemedi: {name}, Hata: {e}")
+
+def parse_profile_startup_arg(argv):
+    """'--profile-startup[=yol]' bayrağını argv'den çıkarır; verilmişse rapor yolunu, yoksa None döndürür."""
+    for arg in list(argv):
+        if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+            argv.remove(arg)
+            return arg.partition('=')[2] or 'startup_profile.json'
+    return None
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    setup_initial_files()
+    multiprocessing.freeze_support()
+    startup_profiler.record('imports', startup_profiler.origin, IMPORTS_DONE_AT)
+    profile_path = parse_profile_startup_arg(sys.argv)
+    if profile_path: startup_profiler.enable(profile_path)
+    with startup_profiler.phase('QApplication'): app = QApplication(sys.argv)
+    with startup_profiler.phase('setup_initial_files'): setup_initial_files()
     splash_pixmap_path = "icons/loading.gif"
     splash = None
     if os.path.exists(splash_pixmap_path):
-        movie = QMovie(splash_pixmap_path)
-        splash_label = QLabel(); splash_label.setMovie(movie); movie.start()
-        splash = QSplashScreen(splash_label.movie().currentPixmap())
-        splash.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint)
-        splash.setEnabled(False)
-        screen_geometry = app.primaryScreen().geometry()
-        splash.move(int((screen_geometry.width() - splash.width()) / 2), int((screen_geometry.height() - splash.height()) / 2))
-        splash.show()
-    player = MusicPlayer()
+        with startup_profiler.phase('splash'):
+            movie = QMovie(splash_pixmap_path)
+            splash_label = QLabel(); splash_label.setMovie(movie); movie.start()
+            splash = QSplashScreen(splash_label.movie().currentPixmap())
+            splash.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint)
+            splash.setEnabled(False)
+            screen_geometry = app.primaryScreen().geometry()
+            splash.move(int((screen_geometry.width() - splash.width()) / 2), int((screen_geometry.height() - splash.height()) / 2))
+            splash.show()
+    with startup_profiler.phase('MusicPlayer.__init__'): player = MusicPlayer()
     if splash:
         splash.finish(player)
-    player.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    with startup_profiler.phase('show'): player.show()
+    sys.exit(app.exec())
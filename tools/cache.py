@@ -0,0 +1,217 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_size(obj, _seen=None):
+    """Bir nesnenin (iç içe dict/list dahil) bellekte kapladığı yaklaşık bayt sayısını hesaplar."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in obj)
+    return size
+
+
+class _LRUShard:
+    __slots__ = ('lock', 'entries', 'bytes')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+
+
+class LRUCache:
+    """Kayıt sayısı ve bayt ile sınırlı, TTL destekli, parçalı (sharded) kilitli LRU önbellek."""
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024, default_ttl=1800, shards=8, sizeof=estimate_size):
+        self.default_ttl = default_ttl
+        self.sizeof = sizeof
+        self._shards = [_LRUShard() for _ in range(max(1, shards))]
+        self._max_entries_per_shard = max(1, max_entries // len(self._shards))
+        self._max_bytes_per_shard = max(1, max_bytes // len(self._shards))
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _shard_for(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _count(self, hits=0, misses=0, evictions=0, expirations=0):
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+            self._expirations += expirations
+
+    def get(self, key, default=None):
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at >= time.monotonic():
+                    shard.entries.move_to_end(key)
+                    hit = True
+                else:
+                    del shard.entries[key]
+                    shard.bytes -= size
+                    hit = False
+        if entry is None:
+            self._count(misses=1)
+            return default
+        if not hit:
+            self._count(misses=1, expirations=1)
+            return default
+        self._count(hits=1)
+        return value
+
+    def set(self, key, value, ttl=None):
+        size = self.sizeof(value)
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        shard = self._shard_for(key)
+        evicted = expired = 0
+        with shard.lock:
+            old = shard.entries.pop(key, None)
+            if old is not None:
+                shard.bytes -= old[2]
+            if size > self._max_bytes_per_shard:
+                return False
+            shard.entries[key] = (value, expires_at, size)
+            shard.bytes += size
+            expired = self._purge_shard(shard)
+            while len(shard.entries) > self._max_entries_per_shard or shard.bytes > self._max_bytes_per_shard:
+                _, (_, _, old_size) = shard.entries.popitem(last=False)
+                shard.bytes -= old_size
+                evicted += 1
+        if evicted or expired:
+            self._count(evictions=evicted, expirations=expired)
+        return True
+
+    def _purge_shard(self, shard):
+        now = time.monotonic()
+        stale_keys = [k for k, (_, expires_at, _) in shard.entries.items() if expires_at < now]
+        for k in stale_keys:
+            shard.bytes -= shard.entries.pop(k)[2]
+        return len(stale_keys)
+
+    def delete(self, key):
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.pop(key, None)
+            if entry is not None:
+                shard.bytes -= entry[2]
+        return entry is not None
+
+    def purge_expired(self):
+        expired = 0
+        for shard in self._shards:
+            with shard.lock:
+                expired += self._purge_shard(shard)
+        if expired:
+            self._count(expirations=expired)
+        return expired
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.bytes = 0
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions, 'expirations': self._expirations}
+        stats['entries'] = len(self)
+        stats['bytes'] = sum(shard.bytes for shard in self._shards)
+        return stats
+
+
+class PersistentCache:
+    """API yanıtlarını SQLite (WAL) üzerinde saklayan, anahtar ailesine göre TTL uygulayan kalıcı önbellek."""
+
+    def __init__(self, path='api_cache.db', ttls=None, default_ttl=1800):
+        self.path = path
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS api_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def ttl_for(self, key):
+        """Anahtarın ailesine (en uzun eşleşen önek) ait TTL süresini döndürür."""
+        best_prefix = None
+        for prefix in self.ttls:
+            if key.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+                best_prefix = prefix
+        return self.ttls[best_prefix] if best_prefix is not None else self.default_ttl
+
+    def get_entry(self, key, allow_stale=False):
+        """(veri, oluşturulma_zamanı) ikilisini döndürür; kayıt yoksa ya da süresi dolmuşsa None."""
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at, expires_at FROM api_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at, expires_at = row
+        if not allow_stale and expires_at < time.time():
+            return None
+        try:
+            return json.loads(value), created_at
+        except ValueError:
+            return None
+
+    def get(self, key, allow_stale=False):
+        entry = self.get_entry(key, allow_stale)
+        return entry[0] if entry else None
+
+    def set(self, key, data, ttl=None):
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl_for(key))
+        value = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO api_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, expires_at)
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM api_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self, grace=0):
+        """Süresi 'grace' saniyeden daha önce dolmuş kayıtları siler ve silinen kayıt sayısını döndürür."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM api_cache WHERE expires_at < ?", (time.time() - grace,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM api_cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
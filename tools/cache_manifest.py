@@ -0,0 +1,306 @@
+import json
+import os
+import threading
+import time
+
+
+class CacheManifest:
+    """music_cache klasöründeki şarkıların boyutunu, son çalınma zamanını, çalınma sayısını ve tamlığını tutan dizin.
+
+    Açılışta bir kez belleğe yüklenir; önbellek sorguları diske gitmeden buradan yanıtlanır. Disk kotası
+    aşıldığında LRU (en uzun süredir çalınmayan) ya da LFU (en az çalınan) politikasıyla tahliye yapar.
+    """
+
+    MANIFEST_NAME = 'manifest.json'
+    PARTIAL_SUFFIXES = ('.part', '.ytdl', '.temp', '.tmp')
+    PARTIAL_MAX_AGE = 600
+    SAVE_DELAY = 5
+    MAGIC_BYTES = {
+        'opus': [(0, b'OggS')], 'ogg': [(0, b'OggS')],
+        'webm': [(0, b'\x1a\x45\xdf\xa3')], 'mka': [(0, b'\x1a\x45\xdf\xa3')],
+        'm4a': [(4, b'ftyp')],
+        'mp3': [(0, b'ID3'), (0, b'\xff\xfb'), (0, b'\xff\xf3'), (0, b'\xff\xf2')],
+    }
+
+    def __init__(self, cache_dir='music_cache', extensions=('opus',), quota_bytes=0, policy='lru'):
+        self.cache_dir = cache_dir
+        self.extensions = tuple(extensions)
+        self.quota_bytes = quota_bytes
+        self.policy = policy
+        self.path = os.path.join(cache_dir, self.MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._save_timer = None
+        self._load()
+
+    def configure(self, quota_bytes=None, policy=None):
+        """Kotayı ve politikayı değiştirir ve hemen uygular; tahliye edilen şarkı sayısını döndürür."""
+        with self._lock:
+            if quota_bytes is not None: self.quota_bytes = quota_bytes
+            if policy is not None: self.policy = policy
+        return self.enforce_quota()
+
+    def eviction_preview(self, quota_bytes, policy=None):
+        """Verilen kota ve politika uygulansa kaç şarkının ve kaç baytın silineceğini (sayı, bayt) olarak döndürür."""
+        with self._lock:
+            previous_policy = self.policy
+            if policy is not None: self.policy = policy
+            try:
+                order = self._eviction_order()
+            finally:
+                self.policy = previous_policy
+            total = self.total_bytes()
+            count, freed = 0, 0
+            for video_id in order:
+                if not quota_bytes or total - freed <= quota_bytes:
+                    break
+                count += 1
+                freed += self._entries[video_id]['size']
+        return count, freed
+
+    def _split_name(self, filename):
+        video_id, _, ext = filename.rpartition('.')
+        return (video_id, ext) if video_id and ext in self.extensions else (None, None)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            saved = {}
+        try:
+            filenames = os.listdir(self.cache_dir)
+        except OSError:
+            filenames = []
+        files_by_id = {}
+        for filename in filenames:
+            video_id, _ = self._split_name(filename)
+            if video_id:
+                files_by_id.setdefault(video_id, []).append(filename)
+        for video_id, names in files_by_id.items():
+            entry = saved.get(video_id)
+            if len(names) > 1:
+                names = self._drop_duplicates(video_id, names, entry)
+            filename = names[0]
+            if entry and entry.get('file') == filename:
+                self._entries[video_id] = entry
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+            except OSError:
+                continue
+            self._entries[video_id] = {'file': filename, 'size': stat.st_size, 'added': stat.st_mtime,
+                                       'last_played': stat.st_mtime, 'play_count': 0, 'complete': True}
+        print(f"Önbellek dizini yüklendi: {len(self._entries)} şarkı, {self.total_bytes() / (1024 * 1024):.1f} MB")
+        if set(saved) != set(self._entries):
+            self._save_now()
+
+    def _drop_duplicates(self, video_id, names, entry):
+        """Aynı şarkının farklı uzantılı kopyalarından (ör. kayıt biçimi değiştikten sonra) birini tutar, diğerlerini siler.
+
+        Dizinde kayıtlı dosya, yoksa en yenisi tutulur; kalanlar kotaya sayılmayan ve hiç silinmeyen yetimler olurdu.
+        """
+        def mtime(name):
+            try:
+                return os.path.getmtime(os.path.join(self.cache_dir, name))
+            except OSError:
+                return 0
+        keep = entry.get('file') if entry and entry.get('file') in names else max(names, key=mtime)
+        for name in names:
+            if name == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                print(f"'{video_id}' için yinelenen önbellek dosyası silindi: {name}")
+            except OSError as e:
+                print(f"Yinelenen önbellek dosyası silinemedi ({name}): {e}")
+        return [keep]
+
+    def lookup(self, video_id):
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry and entry.get('complete', True):
+                return os.path.join(self.cache_dir, entry['file'])
+        return None
+
+    def add(self, video_id, path):
+        """Tamamlanmış bir önbellek dosyasını dizine ekler ve kotayı uygular."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        now = time.time()
+        with self._lock:
+            previous = self._entries.get(video_id, {})
+            self._entries[video_id] = {'file': os.path.basename(path), 'size': size, 'added': now,
+                                       'last_played': previous.get('last_played', now),
+                                       'play_count': previous.get('play_count', 0), 'complete': True}
+        if previous.get('file') and previous['file'] != os.path.basename(path):
+            try:
+                os.remove(os.path.join(self.cache_dir, previous['file']))
+            except OSError:
+                pass
+        self.enforce_quota(protect=(video_id,))
+        self._save_now()
+        return True
+
+    def annotate(self, video_id, **fields):
+        """Kayda ek alanlar (ör. ses yüksekliği) ekler."""
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if not entry:
+                return
+            entry.update(fields)
+        self._schedule_save()
+
+    def record_play(self, video_id):
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if not entry:
+                return
+            entry['last_played'] = time.time()
+            entry['play_count'] = entry.get('play_count', 0) + 1
+        self._schedule_save()
+
+    def remove(self, video_id, delete_file=True):
+        with self._lock:
+            entry = self._entries.pop(video_id, None)
+        if entry is None:
+            return False
+        if delete_file:
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Önbellek dosyası silinemedi ({entry['file']}): {e}")
+                with self._lock:
+                    self._entries.setdefault(video_id, entry)
+                return False
+        self._schedule_save()
+        return True
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry['size'] for entry in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.total_bytes(),
+                    'quota_bytes': self.quota_bytes, 'policy': self.policy}
+
+    def _eviction_order(self):
+        if self.policy == 'lfu':
+            key = lambda item: (item[1].get('play_count', 0), item[1].get('last_played', 0))
+        else:
+            key = lambda item: item[1].get('last_played', 0)
+        return [video_id for video_id, _ in sorted(self._entries.items(), key=key)]
+
+    def enforce_quota(self, protect=()):
+        """Toplam boyut kotanın altına inene kadar politikaya göre şarkı tahliye eder; tahliye edilen sayıyı döndürür."""
+        evicted = 0
+        with self._lock:
+            if not self.quota_bytes or self.total_bytes() <= self.quota_bytes:
+                return 0
+            candidates = [vid for vid in self._eviction_order() if vid not in protect]
+        for video_id in candidates:
+            if self.total_bytes() <= self.quota_bytes:
+                break
+            if self.remove(video_id):
+                evicted += 1
+        if evicted:
+            print(f"Önbellek kotası aşıldı: {evicted} şarkı ({self.policy.upper()}) tahliye edildi.")
+        return evicted
+
+    def _looks_valid(self, path, ext):
+        signatures = self.MAGIC_BYTES.get(ext)
+        if not signatures:
+            return True
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(16)
+        except OSError:
+            return False
+        return any(header[offset:offset + len(magic)] == magic for offset, magic in signatures)
+
+    def _entry_valid(self, entry):
+        path = os.path.join(self.cache_dir, entry['file'])
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        return 0 < size == entry['size'] and self._looks_valid(path, entry['file'].rpartition('.')[2])
+
+    def verify(self, video_id):
+        """Kayıtlı dosyanın boyutunu ve başlık baytlarını denetler; kayıt yoksa ya da dosya bozuksa False döndürür."""
+        with self._lock:
+            entry = self._entries.get(video_id)
+        return bool(entry) and self._entry_valid(entry)
+
+    def integrity_sweep(self):
+        """Çöken indirmelerden kalan yarım dosyaları ve bozuk/eksik önbellek kayıtlarını temizler."""
+        removed = 0
+        now = time.time()
+        try:
+            filenames = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        for filename in filenames:
+            path = os.path.join(self.cache_dir, filename)
+            if filename.endswith(self.PARTIAL_SUFFIXES):
+                try:
+                    if now - os.path.getmtime(path) > self.PARTIAL_MAX_AGE:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        with self._lock:
+            entries = list(self._entries.items())
+        for video_id, entry in entries:
+            if not self._entry_valid(entry):
+                print(f"Önbellekte bozuk ya da eksik dosya bulundu, siliniyor: {entry['file']}")
+                if self.remove(video_id):
+                    removed += 1
+        if removed:
+            print(f"Önbellek bütünlük taraması: {removed} dosya temizlendi.")
+            self._save_now()
+        return removed
+
+    def clear(self):
+        """Tüm önbelleği siler; (silinen dosya sayısı, boşaltılan bayt) döndürür."""
+        with self._lock:
+            video_ids = list(self._entries)
+        file_count, total_size = 0, 0
+        for video_id in video_ids:
+            with self._lock:
+                size = self._entries.get(video_id, {}).get('size', 0)
+            if self.remove(video_id):
+                file_count += 1
+                total_size += size
+        self._save_now()
+        return file_count, total_size
+
+    def _schedule_save(self):
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self._save_now)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save_now(self):
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            data = json.dumps(self._entries, indent=1)
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Önbellek dizini kaydedilemedi: {e}")
+
+    def flush(self):
+        self._save_now()
@@ -0,0 +1,39 @@
+from io import BytesIO
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+
+def dominant_color(image, image_data=None, sample_size=64, bits=4):
+    """QImage'in baskın rengini (r, g, b) olarak döndürür; hesaplanamazsa None.
+
+    Resim önce sample_size kenarlı bir kopyaya küçültülür, pikseller kanal başına 'bits' bite nicemlenir ve
+    en kalabalık renk kutusunun ortalaması alınır. Tüm adımlar NumPy ile vektörel yapılır.
+    """
+    if image is None or image.isNull():
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        # NumPy kurulu değilse eski (saf Python median-cut) yola dönülür.
+        if image_data is None:
+            return None
+        from colorthief import ColorThief
+        return ColorThief(BytesIO(image_data)).get_color(quality=5)
+
+    small = image.scaled(sample_size, sample_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.FastTransformation)
+    small = small.convertToFormat(QImage.Format.Format_RGBA8888)
+    buffer = small.constBits(); buffer.setsize(small.sizeInBytes())
+    rows = np.frombuffer(buffer, np.uint8).reshape(small.height(), small.bytesPerLine())
+    pixels = rows[:, :small.width() * 4].reshape(-1, 4)
+    rgb = pixels[pixels[:, 3] >= 125, :3]
+    # ColorThief gibi neredeyse beyaz pikseller sayılmaz (resim tamamen beyaz değilse).
+    not_white = ~np.all(rgb > 250, axis=1)
+    if not_white.any():
+        rgb = rgb[not_white]
+    if not len(rgb):
+        return None
+    quantised = (rgb >> (8 - bits)).astype(np.int32)
+    boxes = (quantised[:, 0] << (2 * bits)) | (quantised[:, 1] << bits) | quantised[:, 2]
+    best = np.bincount(boxes, minlength=1 << (3 * bits)).argmax()
+    return tuple(int(round(channel)) for channel in rgb[boxes == best].mean(axis=0))
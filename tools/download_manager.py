@@ -0,0 +1,253 @@
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class DownloadCancelledError(Exception):
+    pass
+
+
+class DownloadManager(QObject):
+    """Önbellek indirmelerini sınırlı eşzamanlılıkla, önceliğe göre, yinelenmeden ve yeniden denemeyle yürütür.
+
+    İndirme iş parçacıkları yalnızca ağ işini yapar; FFmpeg son işlemesi motorun süreç havuzuna devredilir ve
+    iş parçacığı hemen sıradaki indirmeye geçer. Bekleyen kuyruk diske yazılır ve uygulama yeniden başlatıldığında
+    kaldığı yerden devam eder.
+    """
+    job_progress = pyqtSignal(str, float)
+    job_finished = pyqtSignal(str, bool, str)
+    queue_changed = pyqtSignal(int, int)
+
+    PRIORITY_CURRENT = 0
+    PRIORITY_USER = 1
+    PRIORITY_BACKGROUND = 2
+
+    def __init__(self, engine, max_concurrent=2, max_retries=3, backoff_base=2.0, queue_file='download_queue.json'):
+        super().__init__()
+        self.engine = engine
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.queue_file = queue_file
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = {}
+        self._active = set()
+        self._processing = set()
+        self._stopping = False
+        self._completed = 0
+        self._failed = 0
+        self._load_queue()
+        for i in range(max(1, max_concurrent)):
+            threading.Thread(target=self._worker_loop, name=f"download-{i}", daemon=True).start()
+
+    def enqueue(self, video_id, title=None, priority=PRIORITY_USER, info=None):
+        """İndirme işini kuyruğa ekler. Şarkı zaten önbellekte, kuyrukta ya da indiriliyorsa yalnızca önceliği yükseltilir."""
+        if not video_id or self.engine.check_cache(video_id) or self.engine.is_caching(video_id):
+            return False
+        with self._cond:
+            job = self._jobs.get(video_id)
+            if job is not None:
+                if priority < job['priority']:
+                    job['priority'] = priority
+                    self._push(video_id, job)
+                    self._cond.notify()
+                return False
+            job = {'title': title or video_id, 'priority': priority, 'attempts': 0, 'not_before': 0,
+                   'info': info, 'cancel': threading.Event()}
+            self._jobs[video_id] = job
+            self._push(video_id, job)
+            self._cond.notify()
+        self._save_queue()
+        self._emit_queue_changed()
+        return True
+
+    def promote(self, video_id, info=None):
+        """Kuyruktaki bir işi en yüksek önceliğe (çalan şarkı) taşır; 'info' verilirse indirmede yeniden çıkarım yapılmaz."""
+        with self._cond:
+            job = self._jobs.get(video_id)
+            if job is None:
+                return
+            if info and not job['info'] and video_id not in self._active:
+                job['info'] = info
+            if job['priority'] == self.PRIORITY_CURRENT:
+                return
+            job['priority'] = self.PRIORITY_CURRENT
+            self._push(video_id, job)
+            self._cond.notify()
+
+    def cancel(self, video_id):
+        with self._cond:
+            job = self._jobs.pop(video_id, None)
+            if job is None:
+                return False
+            job['cancel'].set()
+        self._save_queue()
+        self._emit_queue_changed()
+        return True
+
+    def is_queued(self, video_id):
+        with self._cond:
+            return video_id in self._jobs
+
+    def stats(self):
+        with self._cond:
+            return {'pending': len(self._jobs) - len(self._active) - len(self._processing), 'active': len(self._active),
+                    'processing': len(self._processing), 'completed': self._completed, 'failed': self._failed}
+
+    def shutdown(self):
+        """İşçi iş parçacıklarını durdurur; bekleyen kuyruk bir sonraki açılışta devam etmek üzere diskte kalır."""
+        with self._cond:
+            self._stopping = True
+            for video_id in self._active:
+                self._jobs[video_id]['cancel'].set()
+            self._cond.notify_all()
+
+    def _push(self, video_id, job):
+        heapq.heappush(self._heap, (job['priority'], next(self._seq), video_id))
+
+    def _next_job(self):
+        while not self._stopping:
+            now = time.monotonic()
+            deferred, picked, wait_for = [], None, None
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                priority, _, video_id = entry
+                job = self._jobs.get(video_id)
+                if job is None or job['priority'] != priority or video_id in self._active or video_id in self._processing:
+                    continue
+                if job['not_before'] > now:
+                    deferred.append(entry)
+                    wait_for = min(wait_for or job['not_before'] - now, job['not_before'] - now)
+                    continue
+                picked = video_id
+                break
+            for entry in deferred:
+                heapq.heappush(self._heap, entry)
+            if picked:
+                self._active.add(picked)
+                return picked, self._jobs[picked]
+            self._cond.wait(wait_for)
+        return None, None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                video_id, job = self._next_job()
+            if video_id is None:
+                return
+            self._emit_queue_changed()
+            error, processed = self._run_job(video_id, job)
+            if processed is not None:
+                with self._cond:
+                    self._active.discard(video_id)
+                    self._processing.add(video_id)
+                processed.add_done_callback(lambda future, vid=video_id, j=job: self._on_processed(vid, j, future))
+                self._emit_queue_changed()
+                continue
+            self._finish_job(video_id, job, error)
+
+    def _on_processed(self, video_id, job, future):
+        error = future.exception()
+        with self._cond:
+            self._processing.discard(video_id)
+        if error is None:
+            self.job_progress.emit(video_id, 100.0)
+        self._finish_job(video_id, job, None if error is None else (str(error) or error.__class__.__name__))
+
+    def _finish_job(self, video_id, job, error):
+        with self._cond:
+            self._active.discard(video_id)
+            if job['cancel'].is_set():
+                outcome = 'cancelled' if not self._stopping else 'stopped'
+            elif error is None:
+                outcome = 'done'
+                self._completed += 1
+                self._jobs.pop(video_id, None)
+            elif job['attempts'] < self.max_retries:
+                outcome = 'retry'
+                job['attempts'] += 1
+                job['info'] = None
+                delay = self.backoff_base ** job['attempts'] * random.uniform(0.5, 1.5)
+                job['not_before'] = time.monotonic() + delay
+                self._push(video_id, job)
+                self._cond.notify()
+            else:
+                outcome = 'failed'
+                self._failed += 1
+                self._jobs.pop(video_id, None)
+        if outcome == 'retry':
+            print(f"'{job['title']}' indirilemedi, {job['attempts']}. yeniden deneme {delay:.1f} sn sonra: {error}")
+        elif outcome in ('done', 'failed', 'cancelled'):
+            self.job_finished.emit(video_id, outcome == 'done', '' if outcome == 'done' else (error or "İptal edildi"))
+        if outcome != 'stopped':
+            self._save_queue()
+            self._emit_queue_changed()
+
+    def _run_job(self, video_id, job):
+        last_emit = [0.0]
+
+        def progress_hook(d):
+            if job['cancel'].is_set():
+                raise DownloadCancelledError(video_id)
+            if d.get('status') != 'downloading':
+                return
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            now = time.monotonic()
+            if total and now - last_emit[0] >= 0.25:
+                last_emit[0] = now
+                self.job_progress.emit(video_id, min(100.0, d.get('downloaded_bytes', 0) * 100.0 / total))
+
+        try:
+            path, info = self.engine.fetch_song(video_id, info=job['info'], progress_hook=progress_hook)
+        except Exception as e:
+            return str(e) or e.__class__.__name__, None
+        if job['cancel'].is_set():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None, None
+        return None, self.engine.postprocess_song(video_id, path, info, cancel_event=job['cancel'])
+
+    def _emit_queue_changed(self):
+        stats = self.stats()
+        self.queue_changed.emit(stats['pending'], stats['active'])
+
+    def _save_queue(self):
+        # "Çalan şarkı" önceliği yalnızca bu oturum için anlamlıdır; diske kullanıcı önceliğiyle yazılır.
+        with self._cond:
+            pending = [{'id': vid, 'title': job['title'], 'priority': max(job['priority'], self.PRIORITY_USER), 'attempts': job['attempts']}
+                       for vid, job in self._jobs.items()]
+        try:
+            tmp_path = f"{self.queue_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(pending, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.queue_file)
+        except OSError as e:
+            print(f"İndirme kuyruğu kaydedilemedi: {e}")
+
+    def _load_queue(self):
+        if not os.path.exists(self.queue_file):
+            return
+        try:
+            with open(self.queue_file, 'r', encoding='utf-8') as f:
+                pending = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        for item in pending:
+            video_id = item.get('id')
+            if not video_id or self.engine.check_cache(video_id):
+                continue
+            job = {'title': item.get('title') or video_id, 'priority': max(item.get('priority', self.PRIORITY_USER), self.PRIORITY_USER),
+                   'attempts': item.get('attempts', 0), 'not_before': 0, 'info': None, 'cancel': threading.Event()}
+            self._jobs[video_id] = job
+            self._push(video_id, job)
+        if self._jobs:
+            print(f"Önceki oturumdan {len(self._jobs)} indirme kuyruğa geri yüklendi.")
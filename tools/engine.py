@@ -1,44 +1,204 @@
 import os
+import re
+import copy
 import time
-import yt_dlp
-import wikipediaapi
-import musicbrainzngs
-from ytmusicapi import YTMusic
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from tools.cache import PersistentCache, LRUCache
+from tools.ydl_pool import YDLPool
+from tools.singleflight import SingleFlight
+from tools.stream_proxy import StreamProxy
+from tools.cache_manifest import CacheManifest
+from tools.postprocess_pool import PostProcessPool, postprocess_track
+from tools.upstream import UpstreamGuard
 
 class MusicEngine:
-    def __init__(self, cache_ttl_seconds=1800):
+    CACHE_EXTENSIONS = ('opus', 'webm', 'm4a', 'ogg', 'mp3')
+    CACHE_MODES = {
+        # Kaynak kodek zaten uygunsa (Opus, AAC, Vorbis) ses akışı yeniden kodlanmadan kopyalanır (-acodec copy);
+        # yalnızca tanınmayan kodekler MP3'e dönüştürülür.
+        'remux': {'format': 'bestaudio[acodec=opus]/bestaudio[acodec^=mp4a]/bestaudio/best',
+                  'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'best'}]},
+        'transcode': {'format': 'bestaudio/best',
+                      'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'opus', 'preferredquality': '192'}]},
+    }
+    STREAM_URL_EXPIRY_MARGIN = 300
+    STREAM_URL_DEFAULT_TTL = 1800
+    SEARCH_CURSOR_TTL = 1800
+    ARTIST_LOOKUP_ERROR_TTL = 300
+    WIKIPEDIA_API_URL = "https://{lang}.wikipedia.org/w/api.php"
+    WIKIPEDIA_LANGUAGES = ('tr', 'en')
+    MUSIC_KEYWORDS = ['grup', 'band', 'müzisyen', 'musician', 'şarkıcı', 'singer', 'albüm', 'album', 'rock', 'pop', 'metal', 'sanatçı']
+    FILM_KEYWORDS = ['film', 'movie', 'yönetmen', 'director', 'oyuncu', 'actor', 'actress', 'sinema', 'cinema']
+    CACHE_TTLS = {
+        'search:': 6 * 3600,
+        'browse:': 24 * 3600,
+        'artist_v3:': 7 * 24 * 3600,
+        # Keşfet verisi, süresi geçse bile anında gösterilebilmesi için uzun süre saklanır; tazeliği DISCOVER_MAX_AGE belirler.
+        'discover_v2': 30 * 24 * 3600,
+    }
+    DISCOVER_CACHE_KEY = 'discover_v2'
+    DISCOVER_MAX_AGE = 3 * 3600
+    # Upstream'e ulaşılamadığında sunulabilmesi için süresi dolan kayıtlar diskte bu kadar daha tutulur.
+    STALE_CACHE_GRACE = 30 * 24 * 3600
+    # Upstream başına istemci tarafı hız sınırı (saniyede istek, patlama) ve geçici hatalarda yeniden deneme sayısı.
+    # MusicBrainz ~1 istek/sn sınırını belgeler; 'youtube' yt-dlp çıkarım ve indirmelerini kapsar.
+    UPSTREAM_LIMITS = {
+        'ytmusic': {'rate': 5, 'burst': 10, 'max_retries': 2},
+        'musicbrainz': {'rate': 1, 'burst': 1, 'max_retries': 2},
+        'wikipedia': {'rate': 10, 'burst': 20, 'max_retries': 2},
+        'youtube': {'rate': 2, 'burst': 6, 'max_retries': 1},
+    }
+    DISCOVER_CATEGORIES = ["50s Rock'n'Roll Classics", "Türkçe Rock", "Rock Classics", "Chill Music", "Focus Piano", "Workout Gym"]
+
+    def __init__(self, cache_ttl_seconds=1800, cache_path='api_cache.db', memory_cache_entries=512, memory_cache_bytes=32 * 1024 * 1024, cache_mode='remux', postprocess_workers=None):
         print("MusicEngine başlatılıyor...")
-        self.ytmusic = YTMusic()
-        musicbrainzngs.set_useragent("Lei-Music", "1.0", "mailto:user@example.com")
-        self.wiki_tr = wikipediaapi.Wikipedia(user_agent="Lei-Music/1.0", language='tr', extract_format=wikipediaapi.ExtractFormat.WIKI)
-        self.wiki_en = wikipediaapi.Wikipedia(user_agent="Lei-Music/1.0", language='en', extract_format=wikipediaapi.ExtractFormat.WIKI)
+        # Ağ istemcileri (YTMusic, Wikipedia oturumu, MusicBrainz) ve ağır modülleri ilk kullanımda ya da warm_up() ile
+        # arka planda oluşturulur; kurucu GUI iş parçacığında hızlı kalır.
+        self._client_lock = threading.Lock()
+        self._ytmusic = None
+        self._wiki_session_instance = None
+        self._musicbrainz = None
+        self.upstreams = {name: UpstreamGuard(name, **limits) for name, limits in self.UPSTREAM_LIMITS.items()}
+        self._lookup_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="lookup")
+        self.discover_categories = list(self.DISCOVER_CATEGORIES)
 
-        self._api_cache = {}
         self.CACHE_TTL = cache_ttl_seconds
+        self._api_cache = LRUCache(max_entries=memory_cache_entries, max_bytes=memory_cache_bytes, default_ttl=cache_ttl_seconds)
+        self._disk_cache = PersistentCache(cache_path, ttls=self.CACHE_TTLS, default_ttl=cache_ttl_seconds)
+        self._disk_cache.purge_expired(grace=self.STALE_CACHE_GRACE)
+        self._single_flight = SingleFlight()
+        self._search_cursors = LRUCache(max_entries=32, max_bytes=8 * 1024 * 1024, default_ttl=self.SEARCH_CURSOR_TTL, shards=1)
+        self._stream_url_cache = LRUCache(max_entries=256, max_bytes=2 * 1024 * 1024, default_ttl=self.STREAM_URL_DEFAULT_TTL, shards=4)
 
         if not os.path.exists('music_cache'):
             os.makedirs('music_cache')
+        self.cache_manifest = CacheManifest('music_cache', self.CACHE_EXTENSIONS)
+        threading.Thread(target=self.cache_manifest.integrity_sweep, name="cache-sweep", daemon=True).start()
 
         self.YDL_OPTS_STREAM_URL = {'format': 'bestaudio/best', 'quiet': True}
+        self.postprocess_pool = PostProcessPool(postprocess_workers)
+        self.cache_mode = None
+        self._download_ydl_pool = None
+        self.set_cache_mode(cache_mode)
+        self._stream_ydl_pool = YDLPool(self.YDL_OPTS_STREAM_URL, size=3)
+        self._tee_meta = {}
+        self.stream_proxy = StreamProxy('music_cache', on_cached=self.cache_manifest.add, on_released=self._postprocess_teed,
+                                        resolve_url=self._refresh_stream)
+        print("MusicEngine başarıyla başlatıldı.")
+
+    @property
+    def ytmusic(self):
+        if self._ytmusic is None:
+            with self._client_lock:
+                if self._ytmusic is None:
+                    from ytmusicapi import YTMusic
+                    self._ytmusic = YTMusic()
+        return self._ytmusic
+
+    @ytmusic.setter
+    def ytmusic(self, client):
+        self._ytmusic = client
+
+    @property
+    def _wiki_session(self):
+        if self._wiki_session_instance is None:
+            with self._client_lock:
+                if self._wiki_session_instance is None:
+                    import requests
+                    session = requests.Session()
+                    session.headers['User-Agent'] = "Lei-Music/1.0"
+                    self._wiki_session_instance = session
+        return self._wiki_session_instance
+
+    def _musicbrainz_client(self):
+        if self._musicbrainz is None:
+            with self._client_lock:
+                if self._musicbrainz is None:
+                    import musicbrainzngs
+                    musicbrainzngs.set_useragent("Lei-Music", "1.0", "mailto:user@example.com")
+                    # musicbrainzngs'in kendi 1 istek/sn kilidi yerine 'musicbrainz' jeton kovası kullanılır; bekleme istatistiklerde görünür.
+                    musicbrainzngs.set_rate_limit(False)
+                    self._musicbrainz = musicbrainzngs
+        return self._musicbrainz
+
+    def warm_up(self):
+        """Ağ istemcilerini ve yt-dlp havuzunu önceden oluşturur; açılışta arka plan iş parçacığında çağrılır."""
+        start = time.perf_counter()
+        self.ytmusic
+        self._wiki_session
+        self._musicbrainz_client()
+        try:
+            import tools.search_pager
+        except ImportError as e:
+            print(f"Sayfalı arama kullanılamayacak, tam aramaya dönülecek: {e}")
+        self._stream_ydl_pool.prewarm(background=False)
+        elapsed = time.perf_counter() - start
+        print(f"MusicEngine istemcileri arka planda hazırlandı ({elapsed * 1000:.0f} ms).")
+        return elapsed
+
+    def set_cache_mode(self, mode):
+        """Önbellek indirme modunu değiştirir: 'remux' (yeniden kodlamadan kopyala) ya da 'transcode' (Opus 192k)."""
+        if mode not in self.CACHE_MODES:
+            mode = 'remux'
+        if mode == self.cache_mode:
+            return
+        self.cache_mode = mode
+        # Son işleme (FFmpeg) yt-dlp iş parçacığında değil, PostProcessPool süreçlerinde yapılır; burada yalnızca indirilir.
         self.YDL_OPTS_DOWNLOAD = {
-            'format': 'bestaudio/best', 'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'opus', 'preferredquality': '192'}],
+            'format': self.CACHE_MODES[mode]['format'],
             'outtmpl': os.path.join('music_cache', '%(id)s.%(ext)s'), 'noplaylist': True, 'quiet': True,
             'retries': 10, 'fragment_retries': 10, 'socket_timeout': 10
         }
-        print("MusicEngine başarıyla başlatıldı.")
+        old_pool, self._download_ydl_pool = self._download_ydl_pool, YDLPool(self.YDL_OPTS_DOWNLOAD, size=2)
+        if old_pool is not None:
+            old_pool.close()
+            print(f"Önbellek indirme modu değiştirildi: {mode}")
 
     def _get_from_cache(self, key):
-        if key in self._api_cache:
-            data, timestamp = self._api_cache[key]
-            if time.time() - timestamp < self.CACHE_TTL:
-                print(f"'{key}' için önbellekten başarılı bir şekilde veri çekildi.")
-                return data
+        data = self._api_cache.get(key)
+        if data is not None:
+            print(f"'{key}' için önbellekten başarılı bir şekilde veri çekildi.")
+            return data
+        entry = self._disk_cache.get_entry(key)
+        if entry is not None:
+            data, created_at = entry
+            print(f"'{key}' için disk önbelleğinden veri çekildi.")
+            remaining_ttl = created_at + self._disk_cache.ttl_for(key) - time.time()
+            self._api_cache.set(key, data, ttl=remaining_ttl)
+            return data
         return None
 
     def _set_in_cache(self, key, data):
         print(f"'{key}' için yeni veri önbelleğe alınıyor.")
-        self._api_cache[key] = (data, time.time())
+        self._api_cache.set(key, data, ttl=self._disk_cache.ttl_for(key))
+        try:
+            self._disk_cache.set(key, data)
+        except Exception as e:
+            print(f"Disk önbelleğine yazılamadı ('{key}'): {e}")
+
+    def _get_stale(self, key):
+        """Upstream'e ulaşılamadığında süresi dolmuş olsa bile diskteki son veriyi döndürür."""
+        entry = self._disk_cache.get_entry(key, allow_stale=True)
+        if entry is None:
+            return None
+        print(f"'{key}' için upstream'e ulaşılamadı, eski önbellek verisi sunuluyor.")
+        return entry[0]
+
+    def _call_upstream(self, name, func, *args, **kwargs):
+        return self.upstreams[name].call(func, *args, **kwargs)
+
+    def get_upstream_stats(self):
+        """Her upstream için devre durumu, hız sınırı beklemeleri, yeniden denemeler ve reddedilen çağrıları döndürür."""
+        return {name: guard.stats() for name, guard in self.upstreams.items()}
+
+    def get_cache_stats(self):
+        """Bellek içi API önbelleğinin isabet/ıskalama/tahliye sayaçlarını döndürür."""
+        return self._api_cache.stats()
+
+    def get_single_flight_stats(self):
+        """Birleştirilen (ağa gitmeden uçuştaki isteği bekleyen) tekrar isteklerin sayısını döndürür."""
+        return self._single_flight.stats()
 
     def _parse_track_data(self, track, album_thumbnails=None):
         artist_name = "Bilinmeyen Sanatçı"
@@ -73,48 +233,238 @@ class MusicEngine:
         }
 
     def search_ytmusic(self, query, limit=20, search_filter="songs"):
-        cache_key = f"search:{query}:{limit}:{search_filter}"
-        cached_data = self._get_from_cache(cache_key)
-        if cached_data:
-            return cached_data
+        """İlk 'limit' sonucu döndürür; önbellekteki daha uzun bir sonuç listesi daha küçük limitleri de karşılar."""
+        return self.search_ytmusic_page(query, 0, limit, search_filter)[0]
+
+    def search_ytmusic_page(self, query, offset, page_size=20, search_filter="songs"):
+        """[offset, offset + page_size) aralığındaki sonuçları ve daha fazla sonuç olup olmadığını döndürür.
+
+        Önbellekte olmayan sayfalar saklanan devam belirteciyle çekilir; önceki sayfalar yeniden indirilmez.
+        """
+        cache_key = f"search:{query}:{search_filter}"
+        needed = offset + page_size
+        entry = self._get_from_cache(cache_key) or {'results': [], 'exhausted': False}
+        while len(entry['results']) < needed and not entry['exhausted']:
+            previous_count = len(entry['results'])
+            entry = self._single_flight.do(cache_key, self._fetch_search_pages, cache_key, query, search_filter, needed)
+            if len(entry['results']) <= previous_count:
+                break
+        results = entry['results']
+        return results[offset:needed], len(results) > needed or not entry['exhausted']
 
+    def _parse_search_results(self, search_results, search_filter):
+        if search_filter == "songs":
+            return [self._parse_track_data(song) for song in search_results if song.get('videoId')]
+        elif search_filter == "artists":
+            return [self._parse_artist_data(artist) for artist in search_results if artist.get('browseId')]
+        elif search_filter == "albums":
+            return [self._parse_album_data(album) for album in search_results if album.get('browseId')]
+        return []
+
+    def _fetch_search_pages(self, cache_key, query, search_filter, needed):
+        entry = self._get_from_cache(cache_key) or {'results': [], 'exhausted': False}
+        results = list(entry['results'])
+        if len(results) >= needed or entry['exhausted']:
+            return entry
         try:
-            search_results = self.ytmusic.search(query, filter=search_filter, limit=limit)
-            
-            results = []
-            if search_filter == "songs":
-                results = [self._parse_track_data(song) for song in search_results if song.get('videoId')]
-            elif search_filter == "artists":
-                results = [self._parse_artist_data(artist) for artist in search_results if artist.get('browseId')]
-            elif search_filter == "albums":
-                results = [self._parse_album_data(album) for album in search_results if album.get('browseId')]
-
-            self._set_in_cache(cache_key, results)
-            return results
+            cursor = self._search_cursors.get(cache_key)
+            skip = 0
+            if cursor is None or cursor.delivered != len(results):
+                from tools.search_pager import SearchCursor
+                # Belirteç süresi dolmuş ya da uygulama yeniden başlatılmışsa arama baştan yürütülür, eldeki sonuçlar atlanır.
+                cursor = SearchCursor(self.ytmusic, query, search_filter)
+                skip = len(results)
+            while len(results) < needed and not cursor.exhausted:
+                page = self._parse_search_results(self._call_upstream('ytmusic', cursor.next_page), search_filter)
+                if skip:
+                    dropped = min(skip, len(page)); page = page[dropped:]; skip -= dropped
+                results.extend(page)
+                cursor.delivered = len(results)
+            self._search_cursors.set(cache_key, cursor)
+            exhausted = cursor.exhausted
+        except (ImportError, AttributeError, KeyError, IndexError, TypeError, ValueError) as e:
+            # ytmusicapi'nin iç modülleri ya da ayrıştırıcı imzaları değişirse genel search() API'sine geri dönülür.
+            print(f"Sayfalı arama kullanılamadı, tam aramaya dönülüyor: {e}")
+            try:
+                search_results = self._call_upstream('ytmusic', self.ytmusic.search, query, filter=search_filter, limit=needed)
+            except Exception as e:
+                print(f"YTMusic API '{search_filter}' arama sırasında hata: {e}")
+                return entry if entry['results'] else (self._get_stale(cache_key) or entry)
+            results = self._parse_search_results(search_results, search_filter)
+            exhausted = len(search_results) < needed
         except Exception as e:
             print(f"YTMusic API '{search_filter}' arama sırasında hata: {e}")
-            return []
+            return entry if entry['results'] else (self._get_stale(cache_key) or entry)
+        entry = {'results': results, 'exhausted': exhausted}
+        self._set_in_cache(cache_key, entry)
+        return entry
+
+    def _stream_url_ttl(self, stream_url):
+        """googlevideo URL'sindeki 'expire' zaman damgasından, güvenlik payı düşülmüş geçerlilik süresini hesaplar."""
+        match = re.search(r'[?&/]expire[=/](\d+)', stream_url)
+        if not match:
+            return self.STREAM_URL_DEFAULT_TTL
+        return int(match.group(1)) - time.time() - self.STREAM_URL_EXPIRY_MARGIN
 
-    def get_stream_url(self, video_id):
+    def get_stream_url(self, video_id, force_refresh=False):
+        if force_refresh:
+            self._stream_url_cache.delete(video_id)
+        else:
+            cached_stream = self._stream_url_cache.get(video_id)
+            if cached_stream:
+                print(f"'{video_id}' için stream URL önbellekten alındı.")
+                return cached_stream['url']
         try:
-            with yt_dlp.YoutubeDL(self.YDL_OPTS_STREAM_URL) as ydl:
-                info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-                return info['url']
+            return self._single_flight.do(f"stream:{video_id}", self._extract_stream_info, video_id)['url']
         except Exception as e:
             print(f"Stream URL alınırken hata: {e}")
             return None
 
-    def download_and_cache_song(self, video_id):
+    def peek_stream(self, video_id):
+        """Ağa gitmeden, önbellekte geçerli bir stream varsa {'url', 'ext', 'http_headers'} sözlüğünü döndürür."""
+        return self._stream_url_cache.get(video_id)
+
+    def peek_stream_url(self, video_id):
+        """Ağa gitmeden, yalnızca önbellekte geçerli bir stream URL'si varsa onu döndürür."""
+        cached_stream = self.peek_stream(video_id)
+        return cached_stream['url'] if cached_stream else None
+
+    def has_stream_url(self, video_id):
+        """Şarkının geçerli bir stream URL'si önbellekte varsa True döndürür."""
+        return self.peek_stream_url(video_id) is not None
+
+    def _extract_stream_info(self, video_id):
+        with self._stream_ydl_pool.borrow() as ydl:
+            info = self._call_upstream('youtube', ydl.extract_info, f"https://www.youtube.com/watch?v={video_id}", download=False)
+        ttl = self._stream_url_ttl(info['url'])
+        if ttl > 0:
+            # Proxy'nin önbelleğe yazdığı dosya sonradan etiketlenebilsin diye yalnızca gereken bilgi alanları da saklanır.
+            stream = {'url': info['url'], 'ext': info.get('ext'), 'http_headers': info.get('http_headers'), 'meta': self._stream_meta(info)}
+            self._stream_url_cache.set(video_id, stream, ttl=ttl)
+        return info
+
+    def resolve_for_playback(self, video_id):
+        """Tek bir yt-dlp çıkarımıyla hem stream URL'sini hem de önbellek indirmesinde kullanılacak bilgi sözlüğünü döndürür.
+
+        Stream URL'si önbellekteyse yeniden çıkarım yapılmaz ve 'info' None döner.
+        """
+        cached_stream = self._stream_url_cache.get(video_id)
+        if cached_stream:
+            print(f"'{video_id}' için stream URL önbellekten alındı.")
+            return dict(cached_stream, info=None)
         try:
-            with yt_dlp.YoutubeDL(self.YDL_OPTS_DOWNLOAD) as ydl:
-                ydl.download([f"https://www.youtube.com/watch?v={video_id}"])
-            return True
-        except Exception:
-            return False
+            info = self._single_flight.do(f"stream:{video_id}", self._extract_stream_info, video_id)
+            return {'url': info['url'], 'ext': info.get('ext'), 'http_headers': info.get('http_headers'), 'info': info}
+        except Exception as e:
+            print(f"Stream URL alınırken hata: {e}")
+            return None
+
+    def fetch_song(self, video_id, info=None, progress_hook=None):
+        """Yalnızca ağdan indirme adımı (iş parçacığında çalışır); indirilen dosyanın yolunu ve bilgi sözlüğünü döndürür."""
+        with self._download_ydl_pool.borrow(progress_hook) as ydl:
+            if info:
+                result = self._call_upstream('youtube', ydl.process_ie_result, copy.deepcopy(info), download=True)
+            else:
+                result = self._call_upstream('youtube', ydl.extract_info, f"https://www.youtube.com/watch?v={video_id}", download=True)
+            downloads = result.get('requested_downloads') or [{}]
+            path = downloads[0].get('filepath') or ydl.prepare_filename(result)
+        return path, result
+
+    def postprocess_song(self, video_id, path, info=None, cancel_event=None):
+        """İndirilen dosyayı süreç havuzunda tek FFmpeg çağrısıyla dönüştürür ve etiketler; Future döndürür.
+
+        Future'ın sonucu önbelleğe kaydedilen son dosya yoludur. İşlem sürerken cancel_event kurulursa
+        dosya önbelleğe eklenmez, silinir ve sonuç None olur.
+        """
+        info = info or {}
+        artist = info.get('artist') or info.get('uploader') or ''
+        if artist.endswith(' - Topic'):
+            artist = artist[:-len(' - Topic')]
+        metadata = {'title': info.get('track') or info.get('title'), 'artist': artist, 'album': info.get('album')}
+        pp_args = {k: v for k, v in self.CACHE_MODES[self.cache_mode]['postprocessors'][0].items() if k != 'key'}
+        ext = info.get('ext') or os.path.splitext(path)[1].lstrip('.')
+        job = self.postprocess_pool.submit(postprocess_track, path, ext, pp_args, metadata)
+        done = Future()
+
+        def _on_processed(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"'{video_id}' için son işleme başarısız: {e}")
+                done.set_exception(e)
+                return
+            if cancel_event is not None and cancel_event.is_set():
+                print(f"'{video_id}' son işleme sırasında iptal edildi, dosya önbelleğe eklenmedi.")
+                try:
+                    os.remove(result['path'])
+                except OSError:
+                    pass
+                done.set_result(None)
+                return
+            self.cache_manifest.add(video_id, result['path'])
+            if result['loudness'] is not None:
+                self.cache_manifest.annotate(video_id, loudness=result['loudness'])
+            print(f"'{video_id}' son işlendi: {result['wall'] * 1000:.0f} ms, CPU {result['cpu'] * 1000:.0f} ms")
+            done.set_result(result['path'])
+        job.add_done_callback(_on_processed)
+        return done
+
+    def get_postprocess_stats(self):
+        """Son işleme havuzunun kuyruk derinliğini ve iş başına duvar saati/CPU süresini döndürür."""
+        return self.postprocess_pool.stats()
+
+    def is_caching(self, video_id):
+        """Şarkı şu anda stream proxy'si tarafından önbelleğe yazılıyorsa True döndürür."""
+        session = self.stream_proxy.sessions.get(video_id)
+        return session is not None and not (session.done or session.failed)
+
+    def tee_stream(self, video_id, playback, keep=()):
+        """Şarkıyı yerel proxy üzerinden çaldırır; VLC'nin çektiği baytlar aynı anda music_cache'e yazılır.
+
+        'keep' dışındaki diğer şarkıların süren önbelleğe alma oturumları iptal edilir.
+        """
+        meta = playback.get('meta') or self._stream_meta(playback.get('info'))
+        if meta:
+            self._tee_meta[video_id] = meta
+        return self.stream_proxy.register(video_id, playback['url'], playback.get('ext') or 'webm', playback.get('http_headers'),
+                                          keep=tuple(vid for vid in keep if vid))
+
+    def teed_url(self, video_id):
+        """Şarkı proxy üzerinden çalınıyorsa (ve oturum başarısız olmadıysa) yerel proxy URL'sini döndürür."""
+        return self.stream_proxy.url_for(video_id)
+
+    def _refresh_stream(self, video_id):
+        """Proxy'nin süresi dolan stream URL'sini yenilemesi için önbelleği atlayarak yeniden çıkarım yapar."""
+        if self.get_stream_url(video_id, force_refresh=True) is None:
+            return None
+        return self.peek_stream(video_id)
+
+    @staticmethod
+    def _stream_meta(info):
+        return {key: info.get(key) for key in ('track', 'title', 'artist', 'uploader', 'album')} if info else None
+
+    def _postprocess_teed(self, video_id, path):
+        """Çalınırken önbelleğe yazılan ham dosyayı, çalınması bittikten sonra indirmelerle aynı son işlemeden (kayıt biçimi, etiketler) geçirir."""
+        meta = self._tee_meta.pop(video_id, None)
+        if self.cache_manifest.lookup(video_id) != path:
+            return
+        self.postprocess_song(video_id, path, meta)
 
     def check_cache(self, video_id):
-        cached_path = os.path.join('music_cache', f"{video_id}.opus")
-        return cached_path if os.path.exists(cached_path) else None
+        return self.cache_manifest.lookup(video_id)
+
+    def mark_played(self, video_id):
+        """Önbellekten çalınan şarkının son çalınma zamanını ve çalınma sayısını günceller (LRU/LFU tahliyesi için)."""
+        self.cache_manifest.record_play(video_id)
+
+    def forget_cached(self, video_id):
+        """Oynatılamayan önbellek dosyasını yalnızca doğrulamadan geçemezse dizinden ve diskten kaldırır.
+
+        Geçici çözücü/çıkış hatalarında sağlam dosya silinmez; bu durumda False döner.
+        """
+        if self.cache_manifest.verify(video_id):
+            return False
+        return self.cache_manifest.remove(video_id)
 
     def get_artist_info(self, artist_name):
         if not artist_name or artist_name == "Bilinmeyen Sanatçı":
@@ -124,18 +474,60 @@ class MusicEngine:
         cached_data = self._get_from_cache(cache_key)
         if cached_data:
             return cached_data
+        return self._single_flight.do(cache_key, self._fetch_artist_info, cache_key, artist_name)
+
+    def _fetch_artist_info(self, cache_key, artist_name):
+        """MusicBrainz sorgusunu ve dil başına tek bir toplu Wikipedia isteğini eşzamanlı çalıştırır.
 
+        Adaylar öncelik sırasıyla değerlendirilir; ilk geçerli biyografi kazanır ve yalnızca ondan önceki
+        adayların sonuçları beklenir.
+        """
         print(f"--- API'den bilgi aranıyor: '{artist_name}' ---")
         artist_info = {'name': artist_name, 'bio': "Biyografi bulunamadı.", 'image_url': None}
-        mb_artist_type = None
+        candidate_titles = self._artist_bio_queries(artist_name, 'Person') + self._artist_bio_queries(artist_name, 'Group')
+        candidate_titles = list(dict.fromkeys(candidate_titles))
+        mb_future = self._lookup_executor.submit(self._musicbrainz_artist_type, artist_name)
+        wiki_futures = {lang: self._lookup_executor.submit(self._wikipedia_intros, lang, candidate_titles) for lang in self.WIKIPEDIA_LANGUAGES}
+        lookup_failed = False
         try:
-            result = musicbrainzngs.search_artists(artist=artist_name, limit=1, strict=True)
-            if result['artist-list'] and result['artist-list'][0]['ext:score'] == '100':
-                mb_artist = result['artist-list'][0]
-                mb_artist_type = mb_artist.get('type')
-                print(f"MusicBrainz sonucu: '{artist_name}' bir '{mb_artist_type}'")
+            mb_artist_type = mb_future.result()
         except Exception as e:
             print(f"MusicBrainz hatası: {e}")
+            mb_artist_type, lookup_failed = None, True
+        search_queries = self._artist_bio_queries(artist_name, mb_artist_type)
+        print(f"Wikipedia için denenecek sorgular: {search_queries}")
+        intros = {}
+
+        def intros_for(lang):
+            # Her dilin sonucu ilk gerektiğinde bir kez alınır; hata sorgu başına değil dil başına bir kez kaydedilir.
+            nonlocal lookup_failed
+            if lang not in intros:
+                try:
+                    intros[lang] = wiki_futures[lang].result()
+                except Exception as e:
+                    print(f"Wikipedia ({lang}) sorgusu sırasında hata: {e}")
+                    intros[lang], lookup_failed = {}, True
+            return intros[lang]
+
+        for query in search_queries:
+            for lang in self.WIKIPEDIA_LANGUAGES:
+                summary = intros_for(lang).get(query)
+                if summary and self._is_artist_bio(artist_name, query, summary):
+                    artist_info['bio'] = summary.split('\n')[0].strip()
+                    print(f"DOĞRU BİLGİ BULUNDU! Dil: {lang}, Sorgu: '{query}'")
+                    self._set_in_cache(cache_key, artist_info)
+                    return artist_info
+        if lookup_failed:
+            # Ağ hatasından kaynaklanan boş sonuç diske yazılmaz; varsa eski kayıt sunulur ve kısa süre sonra yeniden denenir.
+            artist_info = self._get_stale(cache_key) or artist_info
+            self._api_cache.set(cache_key, artist_info, ttl=self.ARTIST_LOOKUP_ERROR_TTL)
+        else:
+            # Biyografisi olmayan sanatçılar tüm TTL boyunca yeniden sorgulanmaz (negatif önbellek).
+            self._set_in_cache(cache_key, artist_info)
+        return artist_info
+
+    @staticmethod
+    def _artist_bio_queries(artist_name, mb_artist_type):
         search_queries = []
         if mb_artist_type == 'Person':
             search_queries.extend([f"{artist_name} (şarkıcı)", f"{artist_name} (müzisyen)"])
@@ -143,32 +535,40 @@ class MusicEngine:
             search_queries.extend([f"{artist_name} (müzik grubu)", f"{artist_name} (grup)"])
         search_queries.append(artist_name)
         search_queries.extend([f"{artist_name} (müzik grubu)", f"{artist_name} (şarkıcı)"])
-        search_queries = list(dict.fromkeys(search_queries))
-        print(f"Wikipedia için denenecek sorgular: {search_queries}")
-        MUSIC_KEYWORDS = ['grup', 'band', 'müzisyen', 'musician', 'şarkıcı', 'singer', 'albüm', 'album', 'rock', 'pop', 'metal', 'sanatçı']
-        FILM_KEYWORDS = ['film', 'movie', 'yönetmen', 'director', 'oyuncu', 'actor', 'actress', 'sinema', 'cinema']
-        bio_found = False
-        for query in search_queries:
-            if bio_found: break
-            for lang_wiki in [self.wiki_tr, self.wiki_en]:
-                if bio_found: break
-                try:
-                    page = lang_wiki.page(query)
-                    if page.exists() and len(page.summary) > 50:
-                        summary_lower = page.summary.lower()
-                        if any(keyword in summary_lower for keyword in FILM_KEYWORDS):
-                            print(f"'{query}' sorgusu bir filmle ilgili, atlanıyor.")
-                            continue 
-                        is_music_related = any(keyword in summary_lower for keyword in MUSIC_KEYWORDS)
-                        if artist_name.lower() in summary_lower and is_music_related:
-                            artist_info['bio'] = page.summary.split('\n')[0].strip()
-                            print(f"DOĞRU BİLGİ BULUNDU! Dil: {lang_wiki.language}, Sorgu: '{query}'")
-                            bio_found = True
-                            break 
-                except Exception as e:
-                    print(f"Wikipedia sorgusu '{query}' sırasında hata: {e}")
-        self._set_in_cache(cache_key, artist_info)
-        return artist_info
+        return list(dict.fromkeys(search_queries))
+
+    def _is_artist_bio(self, artist_name, query, summary):
+        if len(summary) <= 50:
+            return False
+        summary_lower = summary.lower()
+        if any(keyword in summary_lower for keyword in self.FILM_KEYWORDS):
+            print(f"'{query}' sorgusu bir filmle ilgili, atlanıyor.")
+            return False
+        return artist_name.lower() in summary_lower and any(keyword in summary_lower for keyword in self.MUSIC_KEYWORDS)
+
+    def _musicbrainz_artist_type(self, artist_name):
+        result = self._call_upstream('musicbrainz', self._musicbrainz_client().search_artists, artist=artist_name, limit=1, strict=True)
+        if result['artist-list'] and result['artist-list'][0]['ext:score'] == '100':
+            mb_artist_type = result['artist-list'][0].get('type')
+            print(f"MusicBrainz sonucu: '{artist_name}' bir '{mb_artist_type}'")
+            return mb_artist_type
+        return None
+
+    def _wikipedia_intros(self, lang, titles):
+        """Birden çok başlığın giriş metnini tek bir MediaWiki isteğiyle çeker; {istenen başlık: özet} döndürür."""
+        def request():
+            response = self._wiki_session.get(self.WIKIPEDIA_API_URL.format(lang=lang), timeout=10, params={
+                'action': 'query', 'format': 'json', 'formatversion': 2, 'prop': 'extracts', 'exintro': 1,
+                'explaintext': 1, 'redirects': 1, 'exlimit': len(titles), 'titles': '|'.join(titles)})
+            response.raise_for_status()
+            return response.json()
+        data = self._call_upstream('wikipedia', request).get('query', {})
+        resolved = {title: title for title in titles}
+        for mapping in ('normalized', 'redirects'):
+            targets = {item['from']: item['to'] for item in data.get(mapping, [])}
+            resolved = {title: targets.get(current, current) for title, current in resolved.items()}
+        extracts = {page['title']: page.get('extract', '') for page in data.get('pages', []) if not page.get('missing')}
+        return {title: extracts[current] for title, current in resolved.items() if extracts.get(current)}
 
     def get_ytmusic_browse_results(self, browse_id):
         if not browse_id: return []
@@ -176,27 +576,29 @@ class MusicEngine:
         cached_data = self._get_from_cache(cache_key)
         if cached_data:
             return cached_data
+        return self._single_flight.do(cache_key, self._fetch_browse_results, cache_key, browse_id)
 
+    def _fetch_browse_results(self, cache_key, browse_id):
         results = []
         try:
             if browse_id.startswith('UC'):
                 print(f"Sanatçı ID'si ({browse_id}) için sonuçlar getiriliyor...")
-                artist_data = self.ytmusic.get_artist(browse_id)
+                artist_data = self._call_upstream('ytmusic', self.ytmusic.get_artist, browse_id)
                 if artist_data.get('songs') and artist_data['songs'].get('browseId'):
                     playlist_id = artist_data['songs']['browseId']
-                    playlist_data = self.ytmusic.get_playlist(playlist_id, limit=50)
+                    playlist_data = self._call_upstream('ytmusic', self.ytmusic.get_playlist, playlist_id, limit=50)
                     results = [self._parse_track_data(track) for track in playlist_data.get('tracks', [])]
                 else: 
                     print(f"Sanatçının ({browse_id}) doğrudan şarkı listesi bulunamadı.")
 
             elif browse_id.startswith('MPRE'):
                 print(f"Albüm ID'si ({browse_id}) için sonuçlar getiriliyor...")
-                album_data = self.ytmusic.get_album(browse_id)
+                album_data = self._call_upstream('ytmusic', self.ytmusic.get_album, browse_id)
                 results = [self._parse_track_data(track, album_data.get('thumbnails')) for track in album_data.get('tracks', [])]
 
             else: 
                 print(f"Çalma Listesi ID'si ({browse_id}) için sonuçlar getiriliyor...")
-                playlist_data = self.ytmusic.get_playlist(browse_id, limit=50)
+                playlist_data = self._call_upstream('ytmusic', self.ytmusic.get_playlist, browse_id, limit=50)
                 results = [self._parse_track_data(track) for track in playlist_data.get('tracks', [])]
 
             if results:
@@ -205,32 +607,85 @@ class MusicEngine:
 
         except Exception as e:
             print(f"ID {browse_id} için içerik getirilirken hata oluştu: {e}")
-            return []
+            return self._get_stale(cache_key) or []
 
-    def get_ytmusic_discover_data(self):
-        """Keşfet kategorilerini paralel olarak çeker. Kategori listesini önbelleğe alır."""
-        cache_key = "discover_data"
-        cached_data = self._get_from_cache(cache_key)
-        if cached_data:
-            return cached_data
+    def set_discover_categories(self, categories):
+        """Keşfet sayfasında aranacak kategori listesini değiştirir; liste değiştiyse True döndürür."""
+        categories = list(dict.fromkeys(c.strip() for c in categories if c and c.strip())) or list(self.DISCOVER_CATEGORIES)
+        changed = categories != self.discover_categories
+        self.discover_categories = categories
+        return changed
 
-        discover_data = {}
-        CATEGORIES_TO_SEARCH = ["50s Rock'n'Roll Classics", "Türkçe Rock", "Rock Classics", "Chill Music", "Focus Piano", "Workout Gym"]
+    def get_discover_snapshot(self):
+        """Son bilinen Keşfet verisini ağa gitmeden döndürür.
 
-        def _fetch(query):
-            try:
-                results = self.ytmusic.search(query, filter="playlists", limit=5) 
-                playlists = [{'title': r['title'], 'browseId': r.get('browseId'), 'thumbnails': r.get('thumbnails')} for r in results if r.get('browseId') and r.get('browseId').startswith(('VL', 'PL'))]
-                return query, playlists
-            except Exception:
-                return query, []
+        Dönen sözlük: {'sections', 'fetched_at', 'age_seconds', 'stale'}; hiç veri yoksa None.
+        Kategori listesi değiştiyse veri eski sayılır ve yalnızca geçerli kategoriler döndürülür.
+        """
+        entry = self._get_from_cache(self.DISCOVER_CACHE_KEY)
+        if not entry or 'sections' not in entry:
+            return None
+        age = max(0.0, time.time() - entry['fetched_at'])
+        sections = {query: entry['sections'][query] for query in self.discover_categories if query in entry['sections']}
+        stale = (age > self.DISCOVER_MAX_AGE or not sections
+                 or entry.get('categories', self.DISCOVER_CATEGORIES) != self.discover_categories)
+        return dict(entry, sections=sections, age_seconds=age, stale=stale)
+
+    def refresh_discover_data(self, on_section=None):
+        """Kategorileri ağdan yeniler ve kayıtlı veriyle karşılaştırır.
 
+        on_section(kategori, çalma_listeleri), değişen her kategori için arama tamamlanır tamamlanmaz çağrılır.
+        Dönen sözlükte anlık görüntü alanlarına ek olarak yalnızca değişen bölümler ('changed') ve
+        kaldırılanlar ('removed') bulunur. Alınamayan kategorilerin eski hali korunur.
+        """
+        return self._single_flight.do("discover_refresh", self._refresh_discover_data, on_section)
+
+    def iter_discover_categories(self, categories=None):
+        """Kategori aramalarını paralel başlatır; her biri bittiği anda (kategori, çalma listeleri) üretir (hata: None)."""
+        categories = list(categories or self.discover_categories)
         with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_query = {executor.submit(_fetch, query): query for query in CATEGORIES_TO_SEARCH}
+            future_to_query = {executor.submit(self._fetch_discover_category, query): query for query in categories}
             for future in as_completed(future_to_query):
-                query, playlists = future.result()
-                if playlists:
-                    discover_data[query] = playlists
-        
-        self._set_in_cache(cache_key, discover_data)
-        return discover_data
\ No newline at end of file
+                yield future_to_query[future], future.result()
+
+    def _fetch_discover_category(self, query):
+        try:
+            results = self._call_upstream('ytmusic', self.ytmusic.search, query, filter="playlists", limit=5)
+        except Exception as e:
+            print(f"Keşfet kategorisi '{query}' alınamadı: {e}")
+            return None
+        return [{'title': r['title'], 'browseId': r.get('browseId'), 'thumbnails': r.get('thumbnails')} for r in results if r.get('browseId') and r.get('browseId').startswith(('VL', 'PL'))]
+
+    def _refresh_discover_data(self, on_section=None):
+        previous = self._get_from_cache(self.DISCOVER_CACHE_KEY) or {}
+        old_sections = previous.get('sections', {})
+        categories = list(self.discover_categories)
+        fetched = {}
+        for query, playlists in self.iter_discover_categories(categories):
+            fetched[query] = playlists
+            if on_section and playlists and playlists != old_sections.get(query):
+                on_section(query, playlists)
+
+        sections, changed = {}, {}
+        for query in categories:
+            playlists = fetched.get(query)
+            if playlists is None:
+                if query in old_sections:
+                    sections[query] = old_sections[query]
+                continue
+            if playlists:
+                sections[query] = playlists
+                if playlists != old_sections.get(query):
+                    changed[query] = playlists
+        removed = [query for query in old_sections if query not in sections]
+
+        if categories and all(playlists is None for playlists in fetched.values()):
+            # Hiçbir kategori alınamadıysa boş veri taze olarak kaydedilmez; aksi halde ağ dönse bile saatlerce yeniden denenmez.
+            if not old_sections:
+                raise ConnectionError("Keşfet içeriği alınamadı. İnternet bağlantınızı kontrol edin.")
+            print("Keşfet verisi yenilenemedi, kayıtlı veri kullanılmaya devam ediliyor.")
+            return dict(self.get_discover_snapshot(), changed={}, removed=[])
+        entry = {'sections': sections, 'fetched_at': time.time(), 'categories': categories}
+        self._set_in_cache(self.DISCOVER_CACHE_KEY, entry)
+        print(f"Keşfet verisi yenilendi: {len(changed)} bölüm değişti, {len(removed)} bölüm kaldırıldı.")
+        return dict(entry, changed=changed, removed=removed, age_seconds=0.0, stale=False)
@@ -0,0 +1,68 @@
+import threading
+
+
+class HTTPPool:
+    """İş parçacıkları arasında paylaşılan, ana makine başına sınırlı ve keep-alive bağlantı havuzu.
+
+    Her iş parçacığı kendi requests.Session'ını (çerez/başlık durumu için) kullanır, ancak hepsi aynı HTTPAdapter'ı,
+    yani aynı urllib3 bağlantı havuzunu paylaşır. pool_block=True olduğundan bir ana makineye 'per_host' bağlantıdan
+    fazlası açılmaz; fazla istekler boşalan bağlantıyı bekler. requests ilk istekte içe aktarılır.
+    """
+
+    def __init__(self, per_host=8, max_hosts=16, user_agent="Lei-Music/1.0"):
+        self.per_host = per_host
+        self.max_hosts = max_hosts
+        self.user_agent = user_agent
+        self._adapter = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = []
+
+    def _get_adapter(self):
+        if self._adapter is None:
+            with self._lock:
+                if self._adapter is None:
+                    from requests.adapters import HTTPAdapter
+                    self._adapter = HTTPAdapter(pool_connections=self.max_hosts, pool_maxsize=self.per_host, pool_block=True)
+        return self._adapter
+
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            session.headers['User-Agent'] = self.user_agent
+            adapter = self._get_adapter()
+            session.mount('http://', adapter); session.mount('https://', adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session().get(url, **kwargs)
+
+    def stats(self):
+        """Açılan bağlantı ve gönderilen istek sayılarını ana makine bazında döndürür."""
+        hosts = {}
+        if self._adapter is not None:
+            for key in list(self._adapter.poolmanager.pools.keys()):
+                pool = self._adapter.poolmanager.pools.get(key)
+                if pool is not None:
+                    hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {'connections_opened': pool.num_connections, 'requests': pool.num_requests}
+        return {'per_host': self.per_host, 'sessions': len(self._sessions), 'hosts': hosts,
+                'connections_opened': sum(h['connections_opened'] for h in hosts.values()),
+                'requests': sum(h['requests'] for h in hosts.values())}
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+            adapter, self._adapter = self._adapter, None
+        for session in sessions:
+            session.close()
+        if adapter is not None:
+            adapter.close()
+        self._local = threading.local()
+
+
+http_pool = HTTPPool()
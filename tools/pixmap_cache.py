@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+
+class PixmapCache:
+    """Çözülmüş resimler için bayt sınırlı LRU önbellek; ekranda gösterilen kayıtlar tahliye edilmez (sabitlenir).
+
+    Bir kayıt, pin() ile bağlanan tutuculardan (ör. widget'lar) biri is_pinned(tutucu) için True döndürdükçe sabittir.
+    Ekrandaki bir widget resmi zaten paylaşımlı olarak tuttuğundan onu tahliye etmek bellek kazandırmaz, yalnızca
+    yeniden çözmeye yol açar. Yalnızca GUI iş parçacığından kullanılır; kilit içermez.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 * 1024, sizeof=None, is_pinned=None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.is_pinned = is_pinned or (lambda holder: False)
+        self._entries = OrderedDict()
+        self._holders = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[0]
+
+    def set(self, key, value):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        size = self.sizeof(value)
+        self._entries[key] = (value, size)
+        self._bytes += size
+        self._evict()
+
+    def pin(self, key, holder):
+        """Kaydı, tutucu ekranda kaldığı sürece tahliyeye karşı sabitler."""
+        holders = self._holders.setdefault(key, [])
+        if not any(h is holder for h in holders):
+            holders.append(holder)
+
+    def _pinned(self, key):
+        holders = self._holders.get(key)
+        if not holders:
+            return False
+        # Artık ekranda olmayan tutucular bırakılır; böylece liste kaydırıldıkça büyümez.
+        holders[:] = [holder for holder in holders if self.is_pinned(holder)]
+        if not holders:
+            del self._holders[key]
+            return False
+        return True
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            if self._pinned(key):
+                continue
+            _, size = self._entries.pop(key)
+            self._holders.pop(key, None)
+            self._bytes -= size
+            self._evictions += 1
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+        self._holders.clear()
+        self._bytes = 0
+
+    def stats(self):
+        pinned = sum(1 for key in list(self._holders) if key in self._entries and self._pinned(key))
+        return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes, 'pinned': pinned,
+                'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions}
@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _cpu_seconds():
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _metadata_args(metadata):
+    args = []
+    for key, value in (metadata or {}).items():
+        if value:
+            args += ['-metadata', f"{key}={value}"]
+    return args
+
+
+def _ffmpeg_executable(ffmpeg_location=None, metadata=None):
+    import yt_dlp
+    from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+    opts = {'quiet': True, 'no_warnings': True}
+    if ffmpeg_location:
+        opts['ffmpeg_location'] = ffmpeg_location
+    if metadata:
+        # Etiketler dönüştürme/remux çağrısının çıktı seçeneklerine eklenir; ayrı bir FFmpeg geçişi gerekmez.
+        opts['postprocessor_args'] = {'extractaudio+ffmpeg_o1': _metadata_args(metadata)}
+    ydl = yt_dlp.YoutubeDL(opts)
+    return ydl, FFmpegPostProcessor(ydl).executable
+
+
+def _extract_audio(ydl, path, ext, pp_args):
+    """Sesi çıkarır; (yeni yol, FFmpeg çalıştı mı) döndürür. Dosya zaten uygun biçimdeyse yt-dlp FFmpeg'i hiç çalıştırmaz."""
+    from yt_dlp.postprocessor import FFmpegExtractAudioPP
+    files_to_delete, info = FFmpegExtractAudioPP(ydl, **pp_args).run({'filepath': path, 'ext': ext})
+    for old_path in files_to_delete:
+        if old_path != info['filepath']:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+    return info['filepath'], bool(files_to_delete)
+
+
+def _write_tags(ffmpeg, path, metadata):
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tag{ext}"
+    args = [ffmpeg, '-v', 'error', '-y', '-i', path, '-map', '0', '-c', 'copy'] + _metadata_args(metadata)
+    try:
+        subprocess.run(args + [tmp_path], check=True, capture_output=True)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _measure_loudness(ffmpeg, path):
+    result = subprocess.run([ffmpeg, '-hide_banner', '-nostats', '-i', path, '-af', 'ebur128=framelog=quiet', '-f', 'null', '-'],
+                            capture_output=True, text=True, errors='replace')
+    matches = re.findall(r'I:\s+(-?[\d.]+) LUFS', result.stderr)
+    return float(matches[-1]) if matches else None
+
+
+def postprocess_track(path, ext, pp_args=None, metadata=None, analyze_loudness=False, ffmpeg_location=None):
+    """İşçi süreçte çalışır: ses çıkarma/dönüştürme ve etiketleme tek FFmpeg çağrısında yapılır.
+
+    EBU R128 ses yüksekliği analizi tüm dosyayı yeniden çözdüğü için isteğe bağlıdır (analyze_loudness).
+    """
+    started_at = time.time()
+    wall_start, cpu_start = time.perf_counter(), _cpu_seconds()
+    steps = {}
+
+    def timed(name, func, *args):
+        step_wall, step_cpu = time.perf_counter(), _cpu_seconds()
+        result = func(*args)
+        steps[name] = (time.perf_counter() - step_wall, _cpu_seconds() - step_cpu)
+        return result
+
+    ydl, ffmpeg = _ffmpeg_executable(ffmpeg_location, metadata)
+    tagged = False
+    if pp_args is not None:
+        path, tagged = timed('transcode', _extract_audio, ydl, path, ext, pp_args)
+    if metadata and not tagged and _metadata_args(metadata):
+        timed('tag', _write_tags, ffmpeg, path, metadata)
+    loudness = timed('loudness', _measure_loudness, ffmpeg, path) if analyze_loudness else None
+    return {'path': path, 'loudness': loudness, 'started_at': started_at, 'steps': steps,
+            'wall': time.perf_counter() - wall_start, 'cpu': _cpu_seconds() - cpu_start}
+
+
+class PostProcessPool:
+    """FFmpeg son işlemlerini (dönüştürme ve etiketleme; istenirse ses yüksekliği analizi) çekirdek sayısıyla sınırlı bir süreç havuzunda yürütür.
+
+    Ağdan indirme iş parçacıklarında kalır; yalnızca CPU yoğun işler buraya gönderilir. Havuz ilk işte oluşturulur.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._totals = {'wall': 0.0, 'cpu': 0.0, 'wait': 0.0}
+        self._steps = {}
+        self._last_job = None
+        self._pending = set()
+
+    def submit(self, func, *args, **kwargs):
+        """İşi kuyruğa ekler ve bir Future döndürür; sonucun 'wall', 'cpu' ve 'started_at' alanları istatistiklere eklenir."""
+        with self._lock:
+            if self._executor is None:
+                # Qt ve ağ iş parçacıkları çalışırken fork güvenli değildir; her platformda 'spawn' kullanılır.
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            self._in_flight += 1
+            submitted_at = time.time()
+            future = self._executor.submit(func, *args, **kwargs)
+            self._pending.add(future)
+        future.add_done_callback(lambda f: self._record(f, submitted_at))
+        return future
+
+    def _record(self, future, submitted_at):
+        with self._lock:
+            self._in_flight -= 1
+            self._pending.discard(future)
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+                return
+            result = future.result()
+            self._completed += 1
+            wait = max(0.0, result.get('started_at', submitted_at) - submitted_at)
+            self._totals['wall'] += result.get('wall', 0.0)
+            self._totals['cpu'] += result.get('cpu', 0.0)
+            self._totals['wait'] += wait
+            for name, (wall, cpu) in result.get('steps', {}).items():
+                step = self._steps.setdefault(name, {'count': 0, 'wall': 0.0, 'cpu': 0.0})
+                step['count'] += 1; step['wall'] += wall; step['cpu'] += cpu
+            self._last_job = {'wall_ms': result.get('wall', 0.0) * 1000, 'cpu_ms': result.get('cpu', 0.0) * 1000, 'wait_ms': wait * 1000}
+
+    def stats(self):
+        with self._lock:
+            done = max(1, self._completed)
+            return {
+                'workers': self.max_workers,
+                'queue_depth': max(0, self._in_flight - self.max_workers),
+                'running': min(self._in_flight, self.max_workers),
+                'completed': self._completed, 'failed': self._failed,
+                'mean_wall_ms': self._totals['wall'] * 1000 / done,
+                'mean_cpu_ms': self._totals['cpu'] * 1000 / done,
+                'mean_wait_ms': self._totals['wait'] * 1000 / done,
+                'last_job': self._last_job,
+                'steps': {name: {'count': s['count'], 'mean_wall_ms': s['wall'] * 1000 / s['count'],
+                                 'mean_cpu_ms': s['cpu'] * 1000 / s['count']} for name, s in self._steps.items()},
+            }
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            pending, self._pending = list(self._pending), set()
+        # Python 3.8'de shutdown(cancel_futures=True) yoktur; henüz başlamamış işler tek tek iptal edilir.
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher:
+    """Çalma kuyruğunda sıradaki şarkıların stream URL'lerini (isteğe bağlı olarak seslerini) arka planda hazırlar."""
+
+    ESTIMATED_BYTES_PER_SECOND = 20 * 1024
+    BUDGET_WINDOW_SECONDS = 3600
+
+    def __init__(self, engine, download_manager=None, depth=2, cache_audio=False, budget_mb_per_hour=200):
+        self.engine = engine
+        self.download_manager = download_manager
+        self.depth = depth
+        self.cache_audio = cache_audio
+        self.budget_bytes = budget_mb_per_hour * 1024 * 1024
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._futures = set()
+        self._spent = deque()
+        self._resolved = 0
+        self._queued_audio = 0
+
+    def configure(self, depth=None, cache_audio=None, budget_mb_per_hour=None):
+        if depth is not None: self.depth = depth
+        if cache_audio is not None: self.cache_audio = cache_audio
+        if budget_mb_per_hour is not None: self.budget_bytes = budget_mb_per_hour * 1024 * 1024
+
+    @staticmethod
+    def upcoming_indices(playlist_length, current_index, loop_mode, depth):
+        """Döngü moduna göre sıradaki 'depth' şarkının indekslerini döndürür (0: kapalı, 1: liste, 2: tek şarkı)."""
+        if playlist_length == 0 or current_index < 0 or loop_mode == 2:
+            return []
+        indices = []
+        for step in range(1, depth + 1):
+            index = current_index + step
+            if index >= playlist_length:
+                if loop_mode != 1:
+                    break
+                index %= playlist_length
+            if index == current_index or index in indices:
+                break
+            indices.append(index)
+        return indices
+
+    def update(self, playlist, current_index, loop_mode):
+        """Kuyruk ya da çalan şarkı değiştiğinde çağrılır; sıradaki şarkılar için arka plan işlerini başlatır."""
+        if self.depth <= 0:
+            return
+        for index in self.upcoming_indices(len(playlist), current_index, loop_mode, self.depth):
+            song = playlist[index]
+            video_id = song.get('id')
+            if song.get('type', 'song') != 'song' or not video_id or self.engine.check_cache(video_id):
+                continue
+            if self.cache_audio and self.download_manager and self._take_budget(song):
+                if self.download_manager.enqueue(video_id, song.get('title'), self.download_manager.PRIORITY_BACKGROUND):
+                    self._queued_audio += 1
+            with self._lock:
+                if video_id in self._in_flight:
+                    continue
+                self._in_flight.add(video_id)
+                future = self._executor.submit(self._resolve, video_id)
+                self._futures.add(future)
+            future.add_done_callback(self._forget_future)
+
+    def _forget_future(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _resolve(self, video_id):
+        try:
+            if not self.engine.has_stream_url(video_id):
+                if self.engine.get_stream_url(video_id):
+                    with self._lock:
+                        self._resolved += 1
+                    print(f"'{video_id}' için stream URL önceden hazırlandı.")
+        finally:
+            with self._lock:
+                self._in_flight.discard(video_id)
+
+    def _take_budget(self, song):
+        estimated = (song.get('duration') or 240) * self.ESTIMATED_BYTES_PER_SECOND
+        now = time.monotonic()
+        with self._lock:
+            while self._spent and now - self._spent[0][0] > self.BUDGET_WINDOW_SECONDS:
+                self._spent.popleft()
+            if sum(size for _, size in self._spent) + estimated > self.budget_bytes:
+                return False
+            self._spent.append((now, estimated))
+            return True
+
+    def stats(self):
+        with self._lock:
+            spent = sum(size for _, size in self._spent)
+            return {'resolved_urls': self._resolved, 'queued_audio': self._queued_audio,
+                    'in_flight': len(self._in_flight), 'budget_used_mb': spent / (1024 * 1024)}
+
+    def shutdown(self):
+        # Python 3.8 uyumluluğu için cancel_futures yerine bekleyen işler tek tek iptal edilir.
+        with self._lock:
+            futures, self._futures = list(self._futures), set()
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+
+class TrackGapMeter:
+    """Bir şarkının bitişi ile sonrakinin çalmaya başlaması arasındaki sessizliği ölçer.
+
+    Ölçümler sıradaki şarkının önceden hazır olup olmamasına göre ayrı tutulur; böylece ön yüklemenin
+    etkisi (önce/sonra) doğrudan karşılaştırılabilir.
+    """
+
+    def __init__(self, history=200):
+        self._lock = threading.Lock()
+        self._ended_at = None
+        self._ready = None
+        self._samples = {True: deque(maxlen=history), False: deque(maxlen=history)}
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """callback(gap_ms, was_ready) her ölçümde çağrılır."""
+        self._listeners.append(callback)
+
+    def mark_ended(self):
+        with self._lock:
+            self._ended_at = time.perf_counter()
+            self._ready = None
+
+    def mark_next_ready(self, was_ready):
+        with self._lock:
+            if self._ended_at is not None:
+                self._ready = bool(was_ready)
+
+    def cancel(self):
+        with self._lock:
+            self._ended_at = None
+
+    def mark_started(self):
+        with self._lock:
+            if self._ended_at is None:
+                return None
+            gap_ms = (time.perf_counter() - self._ended_at) * 1000
+            was_ready = bool(self._ready)
+            self._samples[was_ready].append(gap_ms)
+            self._ended_at = None
+        for callback in self._listeners:
+            callback(gap_ms, was_ready)
+        return gap_ms
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return {'count': 0, 'mean_ms': None, 'p95_ms': None}
+        ordered = sorted(samples)
+        return {'count': len(ordered), 'mean_ms': sum(ordered) / len(ordered),
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]}
+
+    def stats(self):
+        with self._lock:
+            return {'prefetched': self._summary(self._samples[True]), 'cold': self._summary(self._samples[False])}
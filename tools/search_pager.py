@@ -0,0 +1,75 @@
+import time
+
+from ytmusicapi.continuations import get_continuation_contents, get_continuation_params
+from ytmusicapi.navigation import MRLIR, MUSIC_SHELF, SECTION_LIST, TITLE_TEXT, nav
+from ytmusicapi.parsers.search import get_search_params, parse_search_results
+
+
+class SearchCursor:
+    """Filtreli bir YouTube Music aramasını sayfa sayfa yürütür ve devam (continuation) belirtecini saklar.
+
+    ytmusicapi'nin search() metodu her çağrıda ilk sayfadan başlar; bu sınıf aynı isteği ve ayrıştırıcıları
+    kullanarak yalnızca bir sonraki sayfayı çeker.
+    """
+
+    def __init__(self, ytmusic, query, search_filter):
+        self.ytmusic = ytmusic
+        self.query = query
+        self.search_filter = search_filter
+        self.result_type = search_filter[:-1]
+        self.delivered = 0
+        self.exhausted = False
+        self.created_at = time.monotonic()
+        self._body = {'query': query, 'params': get_search_params(search_filter, None, False)}
+        self._shelf = None
+
+    def _parse(self, contents, category=None):
+        return parse_search_results(contents, self.result_type, category)
+
+    def next_page(self):
+        """Sıradaki sayfanın ytmusicapi sonuçlarını döndürür; sonuç kalmadıysa boş liste döner."""
+        if self.exhausted:
+            return []
+        items = self._first_page() if self._shelf is None else self._continuation_page()
+        if not items:
+            self.exhausted = True
+        return items
+
+    def _first_page(self):
+        response = self.ytmusic._send_request('search', dict(self._body))
+        if 'contents' not in response:
+            self.exhausted = True
+            return []
+        results = response['contents']
+        if 'tabbedSearchResultsRenderer' in results:
+            results = results['tabbedSearchResultsRenderer']['tabs'][0]['tabRenderer']['content']
+        for section in nav(results, SECTION_LIST, True) or []:
+            shelf = section.get('musicShelfRenderer')
+            if not shelf or not shelf.get('contents') or MRLIR not in shelf['contents'][0]:
+                continue
+            category = nav(section, MUSIC_SHELF + TITLE_TEXT, True)
+            # YTM bazen sonuçlara farklı kategoride bir raf ekler; aranan türe ait olmayan raflar atlanır.
+            if category and self.result_type.lower() not in category.lower():
+                continue
+            items = self._parse(shelf['contents'], category)
+            if not items:
+                # Raf dolu ama hiçbir satır ayrıştırılamadıysa ytmusicapi sürümü uyumsuzdur; çağıran tam aramaya döner.
+                raise ValueError(f"arama rafındaki {len(shelf['contents'])} satır ayrıştırılamadı")
+            self._shelf = shelf
+            self.exhausted = 'continuations' not in shelf
+            return items
+        self.exhausted = True
+        return []
+
+    def _continuation_page(self):
+        if 'continuations' not in self._shelf:
+            self.exhausted = True
+            return []
+        response = self.ytmusic._send_request('search', dict(self._body), get_continuation_params(self._shelf))
+        shelf = response.get('continuationContents', {}).get('musicShelfContinuation')
+        if shelf is None:
+            self.exhausted = True
+            return []
+        self._shelf = shelf
+        self.exhausted = 'continuations' not in shelf
+        return get_continuation_contents(shelf, self._parse)
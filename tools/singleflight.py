@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Aynı anahtarla eşzamanlı gelen çağrıları, uçuştaki tek bir işin sonucunu bekleyecek şekilde birleştirir."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+                self._executed += 1
+            else:
+                self._coalesced += 1
+        if not is_leader:
+            print(f"'{key}' için uçuştaki istek bekleniyor (tekrarlanan istek engellendi).")
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'executed': self._executed, 'coalesced': self._coalesced, 'in_flight': len(self._in_flight)}
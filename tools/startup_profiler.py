@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Açılış aşamalarının duvar saati sürelerini iç içe (yığın) olarak kaydeder.
+
+    Rapor iki biçimde yazılır: Chrome/Perfetto/speedscope'un açabildiği trace-event JSON'u ve
+    flamegraph.pl/speedscope için katlanmış yığın (.folded) dosyası. Kayıt her zaman yapılır (maliyeti ihmal edilebilir);
+    dosyalar yalnızca enable() çağrıldıysa yazılır.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = False
+        self.output_path = None
+        self._lock = threading.Lock()
+        self._spans = []
+        self._marks = {}
+        self._stack = []
+        self._threads = {threading.main_thread().name: 1}
+
+    def enable(self, output_path='startup_profile.json'):
+        self.enabled = True
+        self.output_path = output_path
+
+    def _now_ms(self, moment=None):
+        return ((moment if moment is not None else time.perf_counter()) - self.origin) * 1000
+
+    def _thread_id(self, thread_name):
+        with self._lock:
+            return self._threads.setdefault(thread_name, len(self._threads) + 1)
+
+    @contextmanager
+    def phase(self, name):
+        """GUI iş parçacığında adlandırılmış bir aşamayı ölçer; iç içe çağrılar yığın yolunu oluşturur."""
+        self._stack.append(name)
+        path = tuple(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            with self._lock:
+                self._spans.append({'name': name, 'path': path, 'start': start, 'end': end, 'thread': threading.current_thread().name})
+
+    def record(self, name, start, end=None, thread=None):
+        """Geriye dönük bir aşama ekler (ör. modül içe aktarmaları ya da arka plan iş parçacığındaki bir iş)."""
+        thread = thread or threading.current_thread().name
+        path = (name,) if thread != threading.main_thread().name else tuple(self._stack) + (name,)
+        with self._lock:
+            self._spans.append({'name': name, 'path': path, 'start': start, 'end': end if end is not None else time.perf_counter(), 'thread': thread})
+
+    def mark(self, name):
+        """Anlık bir olay kaydeder (ör. 'first_paint'); aynı ad ikinci kez kaydedilmez."""
+        with self._lock:
+            self._marks.setdefault(name, time.perf_counter())
+
+    def has_mark(self, name):
+        with self._lock:
+            return name in self._marks
+
+    def report(self):
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span['start'])
+            marks = dict(self._marks)
+        phases = [{'name': span['name'], 'path': ';'.join(span['path']), 'thread': span['thread'],
+                   'start_ms': round(self._now_ms(span['start']), 3), 'duration_ms': round((span['end'] - span['start']) * 1000, 3)}
+                  for span in spans]
+        return {
+            'time_to_first_paint_ms': round(self._now_ms(marks['first_paint']), 3) if 'first_paint' in marks else None,
+            'time_to_interactive_ms': round(self._now_ms(marks['interactive']), 3) if 'interactive' in marks else None,
+            'marks': {name: round(self._now_ms(moment), 3) for name, moment in marks.items()},
+            'phases': phases,
+        }
+
+    def trace_events(self, report):
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': self._thread_id(thread), 'args': {'name': thread}}
+                  for thread in dict.fromkeys([threading.main_thread().name] + [p['thread'] for p in report['phases']])]
+        for phase in report['phases']:
+            events.append({'name': phase['name'], 'cat': 'startup', 'ph': 'X', 'pid': 1, 'tid': self._thread_id(phase['thread']),
+                           'ts': round(phase['start_ms'] * 1000), 'dur': round(phase['duration_ms'] * 1000)})
+        for name, at_ms in report['marks'].items():
+            events.append({'name': name, 'cat': 'startup', 'ph': 'i', 's': 'g', 'pid': 1, 'tid': 1, 'ts': round(at_ms * 1000)})
+        return events
+
+    def folded_stacks(self, report):
+        """Her yığın yolu için alt aşamalar düşülmüş (öz) süreyi mikrosaniye olarak döndürür."""
+        self_time = {}
+        for phase in report['phases']:
+            key = (phase['thread'], phase['path'])
+            self_time[key] = self_time.get(key, 0.0) + phase['duration_ms']
+            parent = phase['path'].rpartition(';')[0]
+            if parent and (phase['thread'], parent) in self_time:
+                self_time[(phase['thread'], parent)] -= phase['duration_ms']
+        return [f"{thread};{path} {max(0, round(ms * 1000))}" for (thread, path), ms in self_time.items()]
+
+    def write(self, path=None):
+        """Raporu JSON (trace-event + özet) ve .folded olarak yazar; yazılan JSON yolunu döndürür."""
+        path = path or self.output_path or 'startup_profile.json'
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(report), 'displayTimeUnit': 'ms', 'summary': report}, f, indent=2, ensure_ascii=False)
+        with open(os.path.splitext(path)[0] + '.folded', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.folded_stacks(report)) + '\n')
+        return path
+
+    def print_summary(self):
+        report = self.report()
+        print("\n--- Açılış profili ---")
+        for phase in report['phases']:
+            depth = phase['path'].count(';')
+            print(f"{'  ' * depth}{phase['name']:<{40 - 2 * depth}}{phase['start_ms']:>10.1f} ms +{phase['duration_ms']:>8.1f} ms  [{phase['thread']}]")
+        print(f"İlk boyama: {report['time_to_first_paint_ms']} ms, etkileşime hazır: {report['time_to_interactive_ms']} ms")
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,351 @@
+import os
+import itertools
+import re
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class _TeeSession:
+    """Bir şarkının ses baytlarını upstream'den bir kez çeker, önbellek dosyasına yazar ve okuyuculara sunar."""
+
+    READ_SIZE = 64 * 1024
+    SERVE_SIZE = 256 * 1024
+    MAX_URL_REFRESHES = 2
+
+    def __init__(self, video_id, upstream_url, part_path, final_path, http_headers, chunk_size, on_bytes=None, on_cached=None,
+                 resolve_url=None):
+        self.video_id = video_id
+        self.upstream_url = upstream_url
+        self.final_path = final_path
+        self.path = part_path
+        self.http_headers = dict(http_headers or {})
+        self.chunk_size = chunk_size
+        self.on_bytes = on_bytes
+        self.on_cached = on_cached
+        self.resolve_url = resolve_url
+        self.url_refreshes = 0
+        self._refresh_lock = threading.Lock()
+        self.cond = threading.Condition()
+        self.available = 0
+        self.total = None
+        self.content_type = 'application/octet-stream'
+        self.done = False
+        self.failed = False
+        self.cancelled = False
+        self.readers = 0
+        self.retired = False
+        self.released = False
+        self.on_released = None
+
+    def start(self):
+        threading.Thread(target=self._run, name=f"tee-{self.video_id}", daemon=True).start()
+
+    def _open_range(self, start, end=None):
+        upstream_url = self.upstream_url
+        try:
+            return self._request(upstream_url, start, end)
+        except urllib.error.HTTPError as e:
+            if e.code not in (403, 410) or self.resolve_url is None:
+                raise
+        # Süresi dolmuş stream URL'si (403/410) yenilenir ve aynı konumdan devam edilir; VLC hatayı hiç görmez.
+        with self._refresh_lock:
+            if self.upstream_url == upstream_url:
+                if self.url_refreshes >= self.MAX_URL_REFRESHES:
+                    raise IOError("stream URL'si yenilendikten sonra da reddedildi")
+                self.url_refreshes += 1
+                stream = self.resolve_url(self.video_id)
+                if not stream:
+                    raise IOError("stream URL'si yenilenemedi")
+                print(f"'{self.video_id}' stream URL'sinin süresi dolmuş, yenilenip {start}. bayttan devam ediliyor.")
+                self.upstream_url = stream['url']
+                self.http_headers = dict(stream.get('http_headers') or {})
+        return self._request(self.upstream_url, start, end)
+
+    def _request(self, upstream_url, start, end):
+        headers = dict(self.http_headers)
+        headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+        return urllib.request.urlopen(urllib.request.Request(upstream_url, headers=headers), timeout=15)
+
+    def _read_total(self, response):
+        content_range = response.headers.get('Content-Range', '')
+        match = re.search(r'/(\d+)$', content_range)
+        if match:
+            return int(match.group(1))
+        if response.status == 200 and response.headers.get('Content-Length'):
+            return int(response.headers['Content-Length'])
+        return None
+
+    def _run(self):
+        position = 0
+        try:
+            with open(self.path, 'wb') as f:
+                while self.total is None or position < self.total:
+                    chunk_start = position
+                    with self._open_range(position, position + self.chunk_size - 1) as response:
+                        with self.cond:
+                            if self.total is None:
+                                self.total = self._read_total(response)
+                                self.content_type = response.headers.get('Content-Type', self.content_type)
+                                self.cond.notify_all()
+                        while True:
+                            if self.cancelled:
+                                raise IOError("iptal edildi")
+                            data = response.read(self.READ_SIZE)
+                            if not data:
+                                break
+                            f.write(data); f.flush()
+                            position += len(data)
+                            if self.on_bytes:
+                                self.on_bytes(len(data))
+                            with self.cond:
+                                self.available = position
+                                self.cond.notify_all()
+                        whole_body = response.status == 200
+                    if whole_body or position == chunk_start:
+                        break
+            with self.cond:
+                if self.total is None:
+                    self.total = position
+                if position != self.total:
+                    raise IOError(f"eksik indirme ({position}/{self.total} bayt)")
+                os.replace(self.path, self.final_path)
+                self.path = self.final_path
+                self.done = True
+                self.cond.notify_all()
+            print(f"'{self.video_id}' çalınırken önbelleğe alındı: {self.final_path}")
+            if self.on_cached:
+                self.on_cached(self.video_id, self.final_path)
+        except Exception as e:
+            print(f"'{self.video_id}' için stream önbelleğe yazılamadı: {e}")
+            with self.cond:
+                self.failed = True
+                self.cond.notify_all()
+                # Okuyucular arabelleğe alınmış baytları tüketirken .part silinmez; son okuyucu ayrılınca silinir.
+                if self.readers == 0:
+                    self._remove_part()
+
+    def _remove_part(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def cancel(self):
+        """İndirmeyi bir sonraki okumada durdurur; oturum başarısız sayılır ve .part dosyası temizlenir."""
+        self.cancelled = True
+
+    def attach(self):
+        with self.cond:
+            self.readers += 1
+
+    def detach(self):
+        with self.cond:
+            self.readers -= 1
+            if self.readers == 0 and self.failed:
+                self._remove_part()
+        self.maybe_release()
+
+    def retire(self):
+        """Şarkı artık çalınmıyor; tamamlanmış dosya son okuyucu ayrılınca on_released'a devredilir."""
+        self.retired = True
+        self.maybe_release()
+
+    def maybe_release(self):
+        with self.cond:
+            if not (self.done and self.retired and self.readers == 0 and not self.released):
+                return
+            self.released = True
+        if self.on_released:
+            self.on_released(self.video_id, self.final_path)
+
+    def wait_total(self, timeout):
+        with self.cond:
+            self.cond.wait_for(lambda: self.total is not None or self.failed, timeout)
+            return self.total
+
+    def wait_available(self, position, timeout):
+        with self.cond:
+            self.cond.wait_for(lambda: self.available > position or self.done or self.failed, timeout)
+            return self.available
+
+    def read(self, position, size):
+        # Dosya her okumada kısa süreliğine açılır; böylece Windows'ta tamamlanan .part dosyası yeniden adlandırılabilir.
+        with self.cond:
+            with open(self.path, 'rb') as f:
+                f.seek(position)
+                return f.read(size)
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        proxy = self.server.proxy
+        video_id = os.path.basename(self.path).split('.')[0]
+        session = proxy.sessions.get(video_id)
+        total = session.wait_total(proxy.WAIT_TIMEOUT) if session else None
+        if session is None or total is None:
+            self.send_error(404 if session is None else 502)
+            return
+
+        start, end = 0, total - 1
+        match = re.match(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        is_range = bool(match and (match.group(1) or match.group(2)))
+        if is_range:
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), total - 1)
+            else:
+                start = max(0, total - int(match.group(2)))
+        if start >= total:
+            self.send_response(416)
+            self.send_header('Content-Range', f"bytes */{total}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        session.attach()
+        try:
+            if send_body and start > session.available + proxy.PASSTHROUGH_DISTANCE and not session.done:
+                self._passthrough(session, start, end, total)
+                return
+            self.send_response(206 if is_range else 200)
+            self.send_header('Content-Type', session.content_type)
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('Content-Length', str(end - start + 1))
+            if is_range:
+                self.send_header('Content-Range', f"bytes {start}-{end}/{total}")
+            self.end_headers()
+            if not send_body:
+                return
+            position = start
+            while position <= end:
+                available = session.wait_available(position, proxy.WAIT_TIMEOUT)
+                if available <= position:
+                    break
+                data = session.read(position, min(end + 1, available, position + session.SERVE_SIZE) - position)
+                if not data:
+                    break
+                self.wfile.write(data)
+                position += len(data)
+                proxy._count('served_bytes', len(data))
+            if position <= end:
+                self.close_connection = True
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        except OSError as e:
+            print(f"Stream proxy okuma hatası ({video_id}): {e}")
+            self.close_connection = True
+        finally:
+            session.detach()
+
+    def _passthrough(self, session, start, end, total):
+        """Henüz indirilmemiş uzak bir konuma atlanırsa o aralık önbelleğe yazılmadan doğrudan upstream'den aktarılır."""
+        with session._open_range(start, end) as response:
+            self.send_response(206)
+            self.send_header('Content-Type', session.content_type)
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('Content-Length', str(end - start + 1))
+            self.send_header('Content-Range', f"bytes {start}-{end}/{total}")
+            self.end_headers()
+            while True:
+                data = response.read(_TeeSession.READ_SIZE)
+                if not data:
+                    break
+                self.wfile.write(data)
+                self.server.proxy._count('passthrough_bytes', len(data))
+
+
+class StreamProxy:
+    """VLC'nin çaldığı yerel (loopback) stream proxy'si: sesi bir kez çeker, VLC'ye sunar ve aynı baytları önbelleğe yazar."""
+
+    WAIT_TIMEOUT = 30
+    PASSTHROUGH_DISTANCE = 2 * 1024 * 1024
+    MAX_FINISHED_SESSIONS = 16
+
+    def __init__(self, cache_dir, host='127.0.0.1', port=0, chunk_size=10 * 1024 * 1024, on_cached=None, on_released=None, resolve_url=None):
+        self.cache_dir = cache_dir
+        self.on_cached = on_cached
+        self.on_released = on_released
+        self.resolve_url = resolve_url
+        self.chunk_size = chunk_size
+        self.sessions = {}
+        self._session_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stats = {'upstream_bytes': 0, 'served_bytes': 0, 'passthrough_bytes': 0}
+        self.server = ThreadingHTTPServer((host, port), _ProxyHandler)
+        self.server.daemon_threads = True
+        self.server.proxy = self
+        self.host, self.port = self.server.server_address[:2]
+        threading.Thread(target=self.server.serve_forever, name="stream-proxy", daemon=True).start()
+
+    def _count(self, name, amount):
+        with self._lock:
+            self._stats[name] += amount
+
+    def register(self, video_id, upstream_url, ext, http_headers=None, keep=()):
+        """Şarkıyı proxy'ye kaydeder, arka planda önbelleğe almaya başlar ve VLC'ye verilecek yerel URL'yi döndürür.
+
+        Bu şarkı ve 'keep' içindekiler dışında hâlâ indirilen oturumlar iptal edilir; hızlı geçişlerde paralel indirmeler birikmez.
+        Tamamlanmış diğer oturumlar emekliye ayrılır ve dosyaları okuyucuları ayrılınca on_released'a (son işleme) verilir.
+        """
+        with self._lock:
+            retired = []
+            for other_id, other in self.sessions.items():
+                if other_id == video_id or other_id in keep:
+                    continue
+                if other.done:
+                    retired.append(other)
+                elif not other.failed:
+                    print(f"'{other_id}' artık çalınmıyor, stream önbelleğe alma iptal ediliyor.")
+                    other.cancel()
+            session = self.sessions.get(video_id)
+            if session is None or session.failed or session.released:
+                # Başarısız bir oturumun .part dosyası okuyucuları ayrılana kadar durabildiğinden her oturum ayrı dosyaya yazar.
+                part_path = os.path.join(self.cache_dir, f"{video_id}.{ext}.{next(self._session_ids)}.part")
+                final_path = os.path.join(self.cache_dir, f"{video_id}.{ext}")
+                session = _TeeSession(video_id, upstream_url, part_path, final_path, http_headers, self.chunk_size,
+                                      on_bytes=lambda n: self._count('upstream_bytes', n), on_cached=self.on_cached,
+                                      resolve_url=self.resolve_url)
+                session.on_released = self.on_released
+                self.sessions[video_id] = session
+                session.start()
+            self._drop_finished_sessions()
+        for other in retired:
+            other.retire()
+        return f"http://{self.host}:{self.port}/{video_id}.{ext}"
+
+    def url_for(self, video_id):
+        """Şarkının başarısız olmamış bir oturumu varsa yerel URL'sini döndürür; yoksa None."""
+        with self._lock:
+            session = self.sessions.get(video_id)
+            if session is None or session.failed or session.released:
+                return None
+        return f"http://{self.host}:{self.port}/{os.path.basename(session.final_path)}"
+
+    def _drop_finished_sessions(self):
+        finished = [vid for vid, s in self.sessions.items() if s.done or s.failed]
+        for vid in finished[:max(0, len(finished) - self.MAX_FINISHED_SESSIONS)]:
+            del self.sessions[vid]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['active_sessions'] = sum(1 for s in self.sessions.values() if not (s.done or s.failed))
+        return stats
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
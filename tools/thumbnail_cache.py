@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class ThumbnailCache:
+    """Kapak resimlerini (URL, hedef boyut) anahtarıyla diskte saklayan, bayt sınırlı LRU önbellek.
+
+    Resim dosyaları içeriklerinin SHA-256 özetiyle adlandırılır (içerik adresli); aynı baytları döndüren farklı URL'ler
+    tek dosyayı paylaşır. İndeks SQLite'tadır ve her kayıt için ETag/Last-Modified doğrulayıcılarıyla tazelik süresini tutar.
+    lookup() GUI iş parçacığından ağa gitmeden çağrılabilecek kadar hızlıdır; erişim zamanları bellekte biriktirilip toplu yazılır.
+    """
+
+    DEFAULT_MAX_AGE = 7 * 24 * 3600
+    MAX_AGE_CAP = 30 * 24 * 3600
+    TOUCH_FLUSH_THRESHOLD = 64
+
+    def __init__(self, cache_dir='thumbnail_cache', max_bytes=200 * 1024 * 1024, default_max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.default_max_age = default_max_age
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'index.db'), timeout=10, check_same_thread=False)
+        self._touched = {}
+        self._stats = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'stores': 0, 'not_modified': 0, 'evictions': 0}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS thumbnails ("
+                "key TEXT PRIMARY KEY, url TEXT NOT NULL, blob TEXT NOT NULL, bytes INTEGER NOT NULL, etag TEXT, "
+                "last_modified TEXT, expires_at REAL NOT NULL, last_access REAL NOT NULL, color TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS thumbnails_lru ON thumbnails (last_access)")
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(bytes), 0) FROM (SELECT blob, MAX(bytes) AS bytes FROM thumbnails GROUP BY blob)").fetchone()[0]
+
+    @staticmethod
+    def make_key(url, target_size=None):
+        size = f"{target_size[0]}x{target_size[1]}" if target_size else "orig"
+        return f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}_{size}"
+
+    def _blob_path(self, blob):
+        return os.path.join(self.cache_dir, blob[:2], blob)
+
+    def _max_age(self, headers):
+        cache_control = (headers or {}).get('Cache-Control', '') or ''
+        match = re.search(r'max-age=(\d+)', cache_control)
+        if match:
+            return min(int(match.group(1)), self.MAX_AGE_CAP)
+        expires = (headers or {}).get('Expires')
+        if expires:
+            try:
+                return max(0, min(parsedate_to_datetime(expires).timestamp() - time.time(), self.MAX_AGE_CAP))
+            except (TypeError, ValueError):
+                pass
+        return self.default_max_age
+
+    def lookup(self, url, target_size=None):
+        """Diskteki resmi {'data', 'color', 'fresh', 'etag', 'last_modified'} olarak döndürür; yoksa None.
+
+        'fresh' False ise veri yine de gösterilebilir, ancak doğrulayıcılarla yeniden doğrulanmalıdır.
+        """
+        key = self.make_key(url, target_size)
+        with self._lock:
+            row = self._conn.execute("SELECT blob, etag, last_modified, expires_at, color FROM thumbnails WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count(misses=1)
+            return None
+        blob, etag, last_modified, expires_at, color = row
+        try:
+            with open(self._blob_path(blob), 'rb') as f:
+                data = f.read()
+        except OSError:
+            self._remove_keys([key])
+            self._count(misses=1)
+            return None
+        fresh = expires_at >= time.time()
+        with self._lock:
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.TOUCH_FLUSH_THRESHOLD:
+                self.flush()
+            self._count(hits=1, stale_hits=0 if fresh else 1)
+        return {'data': data, 'color': tuple(json.loads(color)) if color else None, 'fresh': fresh,
+                'etag': etag, 'last_modified': last_modified}
+
+    def store(self, url, target_size, data, headers=None, color=None):
+        """Resim baytlarını içerik özetiyle yazar ve indeksi günceller; gerekirse LRU tahliyesi yapar."""
+        headers = headers or {}
+        if 'no-store' in (headers.get('Cache-Control', '') or ''):
+            return False
+        blob = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(blob)
+        key = self.make_key(url, target_size)
+        now = time.time()
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._total_bytes += len(data)
+            old = self._conn.execute("SELECT blob FROM thumbnails WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbnails (key, url, blob, bytes, etag, last_modified, expires_at, last_access, color) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, blob, len(data), headers.get('ETag'), headers.get('Last-Modified'), now + self._max_age(headers), now,
+                 json.dumps(list(color)) if color else None))
+            if old and old[0] != blob:
+                self._release_blob(old[0])
+            self._touched.pop(key, None)
+            self._count(stores=1)
+            self._enforce_limit()
+            self._conn.commit()
+        return True
+
+    def revalidated(self, url, target_size, headers=None):
+        """304 Not Modified yanıtından sonra kaydın tazelik süresini ve doğrulayıcılarını yeniler."""
+        headers = headers or {}
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE thumbnails SET expires_at = ?, last_access = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (now + self._max_age(headers), now, headers.get('ETag'), headers.get('Last-Modified'), self.make_key(url, target_size)))
+            self._conn.commit()
+            self._count(not_modified=1)
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._stats[name] += amount
+
+    def _flush_touches(self):
+        if self._touched:
+            self._conn.executemany("UPDATE thumbnails SET last_access = ? WHERE key = ?",
+                                   [(at, key) for key, at in self._touched.items()])
+            self._touched.clear()
+
+    def _release_blob(self, blob):
+        """Blob'a başvuran kayıt kalmadıysa dosyayı siler."""
+        if self._conn.execute("SELECT 1 FROM thumbnails WHERE blob = ? LIMIT 1", (blob,)).fetchone():
+            return
+        path = self._blob_path(blob)
+        try:
+            self._total_bytes -= os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _remove_keys(self, keys):
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute("SELECT blob FROM thumbnails WHERE key = ?", (key,)).fetchone()
+                self._conn.execute("DELETE FROM thumbnails WHERE key = ?", (key,))
+                self._touched.pop(key, None)
+                if row:
+                    self._release_blob(row[0])
+            self._conn.commit()
+
+    def _enforce_limit(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        self._flush_touches()
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT key, blob FROM thumbnails ORDER BY last_access LIMIT 32").fetchall()
+            if not rows:
+                break
+            for key, blob in rows:
+                self._conn.execute("DELETE FROM thumbnails WHERE key = ?", (key,))
+                self._release_blob(blob)
+                self._stats['evictions'] += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._enforce_limit()
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM thumbnails").fetchone()[0]
+            return dict(self._stats, entries=entries, bytes=self._total_bytes, max_bytes=self.max_bytes)
+
+    def flush(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            blobs = [row[0] for row in self._conn.execute("SELECT DISTINCT blob FROM thumbnails")]
+            self._conn.execute("DELETE FROM thumbnails")
+            self._conn.commit()
+            self._touched.clear()
+            for blob in blobs:
+                try:
+                    os.remove(self._blob_path(blob))
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
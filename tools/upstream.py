@@ -0,0 +1,205 @@
+import random
+import socket
+import threading
+import time
+
+
+class UpstreamUnavailableError(Exception):
+    """Devre kesici açıkken ya da hız sınırı beklemesi aşıldığında ağa hiç gidilmeden fırlatılır."""
+
+
+TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+TRANSIENT_ERROR_NAMES = {'ConnectionError', 'ConnectTimeout', 'ReadTimeout', 'Timeout', 'NetworkError', 'URLError',
+                         'TransportError', 'RemoteDisconnected', 'IncompleteRead'}
+TRANSIENT_MESSAGES = ('429', 'too many requests', 'timed out', 'temporarily unavailable', 'connection reset',
+                      'connection refused', '503 service', 'name or service not known')
+
+
+def _status_code(exc):
+    for candidate in (exc, getattr(exc, 'cause', None)):
+        if candidate is None:
+            continue
+        response = getattr(candidate, 'response', None)
+        for status in (getattr(response, 'status_code', None), getattr(candidate, 'code', None), getattr(candidate, 'status', None)):
+            if isinstance(status, int):
+                return status
+    return None
+
+
+def is_transient(exc):
+    """Hatanın upstream'in geçici olarak ulaşılamaz ya da aşırı yüklü olduğunu gösterip göstermediğini tahmin eder."""
+    status = _status_code(exc)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    if isinstance(exc, (TimeoutError, ConnectionError, socket.timeout)):
+        return True
+    if type(exc).__name__ in TRANSIENT_ERROR_NAMES:
+        return True
+    message = str(exc).lower()
+    return any(marker in message for marker in TRANSIENT_MESSAGES)
+
+
+def _retry_after(exc):
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Saniyede 'rate' jeton üreten, en fazla 'burst' jeton biriktiren hız sınırlayıcı."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, max_wait=None):
+        """Bir jeton alır; gerekirse bekler. Beklenen süreyi döndürür, max_wait aşılacaksa None döner."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            if max_wait is not None and wait > max_wait:
+                self._tokens += 1
+                return None
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self._tokens)
+
+
+class CircuitBreaker:
+    """Art arda 'failure_threshold' geçici hatadan sonra açılır; 'reset_timeout' sonra tek bir deneme çağrısına izin verir."""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Geçici hatayı kaydeder; devre bu hatayla açıldıysa True döndürür."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def retry_in(self):
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class UpstreamGuard:
+    """Bir upstream'e yapılan çağrıları jeton kovası, jitter'lı üstel geri çekilme ve devre kesiciyle korur."""
+
+    def __init__(self, name, rate, burst, max_retries=2, backoff_base=0.5, backoff_max=8.0,
+                 failure_threshold=5, reset_timeout=30.0, max_wait=20.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'successes': 0, 'errors': 0, 'transient_failures': 0, 'retries': 0,
+                       'rejected': 0, 'throttled': 0, 'throttle_wait_ms': 0.0, 'trips': 0}
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._stats[name] += amount
+
+    def backoff_delay(self, attempt, exc=None):
+        """Tam jitter'lı üstel bekleme: [0, min(backoff_max, base * 2^attempt)]; Retry-After varsa ona uyulur."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = _retry_after(exc) if exc is not None else None
+        return min(self.backoff_max, max(delay, retry_after)) if retry_after else delay
+
+    def call(self, func, *args, **kwargs):
+        self._count(calls=1)
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count(rejected=1)
+                raise UpstreamUnavailableError(f"{self.name} geçici olarak devre dışı ({self.breaker.retry_in():.0f} sn sonra yeniden denenecek)")
+            waited = self.bucket.acquire(self.max_wait)
+            if waited is None:
+                self._count(rejected=1)
+                raise UpstreamUnavailableError(f"{self.name} hız sınırı aşıldı")
+            if waited:
+                self._count(throttled=1, throttle_wait_ms=waited * 1000)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    # Upstream yanıt verdi (ör. video bulunamadı); devre açısından başarılı sayılır.
+                    self.breaker.record_success()
+                    self._count(errors=1)
+                    raise
+                self._count(transient_failures=1)
+                if self.breaker.record_failure():
+                    self._count(trips=1)
+                    print(f"'{self.name}' için devre kesici açıldı: {e}")
+                if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                attempt += 1
+                self._count(retries=1)
+                print(f"'{self.name}' geçici hata, {attempt}. yeniden deneme {delay:.1f} sn sonra: {e}")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            self._count(successes=1)
+            return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(state=self.breaker.state, consecutive_failures=self.breaker.consecutive_failures,
+                     retry_in=self.breaker.retry_in(), tokens=self.bucket.available())
+        return stats
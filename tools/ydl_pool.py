@@ -0,0 +1,126 @@
+import threading
+from contextlib import contextmanager
+
+
+class _ProgressHook:
+    """Her YoutubeDL örneğine bir kez eklenen sabit ilerleme kancası; çağrıları o anki ödünç alanın geri çağrısına iletir."""
+
+    def __init__(self):
+        self.callback = None
+
+    def __call__(self, status):
+        callback = self.callback
+        if callback is not None:
+            callback(status)
+
+
+class YDLPool:
+    """Uzun ömürlü, önceden ısıtılmış yt_dlp.YoutubeDL örneklerini iş parçacıklarına ödünç veren küçük havuz.
+
+    Bir YoutubeDL örneği aynı anda tek bir iş parçacığı tarafından kullanılır; boşta örnek yoksa
+    havuz boyutuna kadar yenisi oluşturulur, sonrasında bir örnek geri verilene kadar beklenir.
+    Havuz kapatıldıktan sonra geri verilen örnekler de kapatılır.
+    """
+
+    def __init__(self, opts, size=2, warm_extractors=('Youtube',), ydl_factory=None):
+        self.opts = dict(opts)
+        self.size = max(1, size)
+        self.warm_extractors = tuple(warm_extractors)
+        self._factory = ydl_factory
+        self._idle = []
+        self._cond = threading.Condition()
+        self._created = 0
+        self._closed = False
+
+    def _create(self):
+        if self._factory is None:
+            # yt_dlp'nin içe aktarılması pahalıdır; ilk örnek oluşturulurken yüklenir.
+            import yt_dlp
+            self._factory = yt_dlp.YoutubeDL
+        ydl = self._factory(dict(self.opts))
+        for ie_key in self.warm_extractors:
+            try:
+                ydl.get_info_extractor(ie_key)
+            except Exception as e:
+                print(f"yt-dlp çıkarıcısı ısıtılamadı ({ie_key}): {e}")
+        hook = _ProgressHook()
+        if hasattr(ydl, 'add_progress_hook'):
+            ydl.add_progress_hook(hook)
+        return ydl, hook
+
+    def _create_in_slot(self):
+        try:
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, entry):
+        entry[1].callback = None
+        with self._cond:
+            if not self._closed:
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+            self._created -= 1
+        self._close_instance(entry[0])
+
+    @staticmethod
+    def _close_instance(ydl):
+        try:
+            ydl.close()
+        except Exception:
+            pass
+
+    def prewarm(self, background=True):
+        """Havuzu boyutuna kadar doldurur; varsayılan olarak arka planda çalışır."""
+        def _fill():
+            while True:
+                with self._cond:
+                    if self._closed or self._created >= self.size:
+                        return
+                    self._created += 1
+                try:
+                    entry = self._create_in_slot()
+                except Exception as e:
+                    print(f"yt-dlp havuzu ısıtılamadı: {e}")
+                    return
+                self._release(entry)
+        if background:
+            threading.Thread(target=_fill, name="ydl-pool-prewarm", daemon=True).start()
+        else:
+            _fill()
+
+    @contextmanager
+    def borrow(self, progress_hook=None):
+        """Bir YoutubeDL örneği ödünç verir; progress_hook yalnızca bu ödünç süresince ilerleme olaylarını alır."""
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                # Kapatılmış havuzda bekleyen kalmaz; geri verildiğinde kapatılacak geçici bir örnek oluşturulur.
+                if self._closed or self._created < self.size:
+                    self._created += 1
+                    entry = None
+                    break
+                self._cond.wait()
+        if entry is None:
+            entry = self._create_in_slot()
+        entry[1].callback = progress_hook
+        try:
+            yield entry[0]
+        finally:
+            self._release(entry)
+
+    def close(self):
+        """Boştaki örnekleri kapatır; ödünçte olanlar geri verildiklerinde kapatılır."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for ydl, _ in idle:
+            self._close_instance(ydl)